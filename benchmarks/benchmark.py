@@ -0,0 +1,288 @@
+"""Scale benchmark of the Sonic integration against the fake Hero Labs API.
+
+Sets the integration up in a bare Home Assistant instance for 1, 50 and 500
+devices and reports, for each size:
+
+- setup_s: wall time of async_setup_entry without a cached state
+- cached_setup_s: the same with the state cached by the first run
+- requests_setup / requests_per_cycle: API requests made by the setup and
+  by one forced poll of every coordinator
+- writes_per_cycle: entity state writes caused by that poll
+- write_s / requests_write / write_failures: wall time, API requests and
+  failures of a settings change on every property followed by closing
+  every valve without waiting for confirmation
+- peak_memory_mb: peak traced memory while set up and polled
+
+Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks.benchmark [--devices 1 50 500] [--latency 0.05]
+        [--throttle-rate 0.01] [--error-rate 0.01]
+        [--json results.json] [--compare baseline.json --tolerance 0.2]
+
+With --compare the run fails when a metric regresses by more than the
+tolerance relative to the baseline. Injected 500 errors only start once the
+entry is set up, so the setup itself does not fail."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+import json
+import logging
+import math
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+# The core has to be imported before the loader to avoid a circular import.
+from homeassistant.core import CoreState, HomeAssistant  # isort:skip
+from homeassistant import loader
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+    issue_registry as ir,
+)
+from homeassistant.helpers.entity import Entity
+
+from .fake_api import FakeHeroLabsApi
+
+REPOSITORY = Path(__file__).resolve().parent.parent
+EMAIL = "benchmark@example.com"
+PASSWORD = "benchmark"
+ENTRY_ID = "benchmark"
+# Devices per simulated property.
+SONICS_PER_PROPERTY = 5
+
+# Metrics where lower is better, compared against a baseline.
+GATED_METRICS = (
+    "setup_s",
+    "cached_setup_s",
+    "requests_setup",
+    "requests_per_cycle",
+    "writes_per_cycle",
+    "write_s",
+    "requests_write",
+    "write_failures",
+    "peak_memory_mb",
+)
+
+
+async def _async_start_hass(config_dir: str) -> HomeAssistant:
+    """Start a bare Home Assistant instance able to load the integration."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.data["entity_info"] = {}
+    await asyncio.gather(
+        ar.async_load(hass),
+        dr.async_load(hass),
+        er.async_load(hass),
+        ir.async_load(hass),
+    )
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    hass.state = CoreState.running
+    return hass
+
+
+async def _async_setup_entry(hass: HomeAssistant) -> tuple[ConfigEntry, float]:
+    """Add and set up the config entry, returning the setup wall time."""
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain="sonic",
+        title="Sonic",
+        data={"username": EMAIL, "password": PASSWORD},
+        source="user",
+        entry_id=ENTRY_ID,
+    )
+    started = time.perf_counter()
+    await hass.config_entries.async_add(entry)
+    elapsed = time.perf_counter() - started
+    await hass.async_block_till_done()
+    return entry, elapsed
+
+
+async def _async_poll_cycle(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Refresh every coordinator of the entry once."""
+    entry_data = hass.data["sonic"][entry.entry_id]
+    await entry_data["fleet"].async_refresh()
+    await asyncio.gather(
+        *[device.async_refresh() for device in entry_data["devices"]],
+        *[prop.async_refresh() for prop in entry_data["properties"]],
+    )
+    await hass.async_block_till_done()
+
+
+async def _async_write(hass: HomeAssistant, entry: ConfigEntry) -> int:
+    """Change a setting of every property and close every valve, returning
+    the number of writes that failed."""
+    entry_data = hass.data["sonic"][entry.entry_id]
+    outcomes = await asyncio.gather(
+        *[
+            prop.async_update_property_settings({"auto_shut_off": False})
+            for prop in entry_data["properties"]
+        ],
+        return_exceptions=True,
+    )
+    response = await hass.services.async_call(
+        "sonic",
+        "close_valves",
+        {"confirm": False},
+        blocking=True,
+        return_response=True,
+    )
+    await hass.async_block_till_done()
+    return sum(1 for outcome in outcomes if isinstance(outcome, Exception)) + sum(
+        1 for device in response["devices"] if device["outcome"] == "failed"
+    )
+
+
+async def async_benchmark(
+    devices: int,
+    latency: float,
+    throttle_rate: float = 0.0,
+    error_rate: float = 0.0,
+) -> dict[str, Any]:
+    """Benchmark the integration with an account holding a number of devices."""
+    api = FakeHeroLabsApi(latency=latency, throttle_rate=throttle_rate)
+    api.add_account(
+        EMAIL,
+        PASSWORD,
+        properties=math.ceil(devices / SONICS_PER_PROPERTY),
+        sonics_per_property=min(devices, SONICS_PER_PROPERTY),
+    )
+    account = api.accounts[EMAIL]
+    for sonic_id in list(account.sonics)[devices:]:
+        del account.sonics[sonic_id]
+    base_url = await api.start()
+
+    writes: Counter[str] = Counter()
+    write_ha_state = Entity._async_write_ha_state
+
+    def counting_write(entity: Entity) -> None:
+        writes[entity.entity_id] += 1
+        write_ha_state(entity)
+
+    results: dict[str, Any] = {"devices": devices}
+    config_dir = tempfile.mkdtemp(prefix="sonic-benchmark-")
+    (Path(config_dir) / "custom_components").symlink_to(
+        REPOSITORY / "custom_components"
+    )
+    sys.path.insert(0, config_dir)
+    try:
+        with patch("herolabsapi.client.BASE_RESOURCE", base_url), patch.object(
+            Entity, "_async_write_ha_state", counting_write
+        ):
+            tracemalloc.start()
+            hass = await _async_start_hass(config_dir)
+            entry, results["setup_s"] = await _async_setup_entry(hass)
+            results["requests_setup"] = sum(api.requests.values())
+            api.error_rate = error_rate
+
+            api.requests.clear()
+            await _async_poll_cycle(hass, entry)
+            writes.clear()
+            api.requests.clear()
+            await _async_poll_cycle(hass, entry)
+            results["requests_per_cycle"] = sum(api.requests.values())
+            results["writes_per_cycle"] = sum(writes.values())
+
+            api.requests.clear()
+            started = time.perf_counter()
+            results["write_failures"] = await _async_write(hass, entry)
+            results["write_s"] = time.perf_counter() - started
+            results["requests_write"] = sum(api.requests.values())
+            results["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+            await hass.async_stop(force=True)
+
+            # Start again from the state cached by the first instance.
+            (Path(config_dir) / ".storage" / "core.config_entries").unlink(
+                missing_ok=True
+            )
+            hass = await _async_start_hass(config_dir)
+            _, results["cached_setup_s"] = await _async_setup_entry(hass)
+            await hass.async_stop(force=True)
+    finally:
+        sys.path.remove(config_dir)
+        shutil.rmtree(config_dir, ignore_errors=True)
+        await api.stop()
+    return results
+
+
+def _compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float
+) -> list[str]:
+    """Return the metrics regressing beyond the tolerance."""
+    regressions = []
+    previous = {run["devices"]: run for run in baseline}
+    for run in results:
+        if (reference := previous.get(run["devices"])) is None:
+            continue
+        for metric in GATED_METRICS:
+            if metric not in reference:
+                continue
+            if run[metric] > reference[metric] * (1 + tolerance) + 1e-3:
+                regressions.append(
+                    f"{run['devices']} devices: {metric} {run[metric]:.3f}"
+                    f" > {reference[metric]:.3f}"
+                )
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="fraction answered with 429"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction answered with 500"
+    )
+    parser.add_argument("--json", type=Path, help="write the results to a file")
+    parser.add_argument("--compare", type=Path, help="baseline results to gate on")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    results = [
+        asyncio.run(
+            async_benchmark(devices, args.latency, args.throttle_rate, args.error_rate)
+        )
+        for devices in args.devices
+    ]
+    columns = ("devices", *GATED_METRICS)
+    print(" ".join(f"{column:>18}" for column in columns))
+    for run in results:
+        print(
+            " ".join(
+                f"{run[column]:>18.3f}"
+                if isinstance(run[column], float)
+                else f"{run[column]:>18}"
+                for column in columns
+            )
+        )
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.compare:
+        regressions = _compare(
+            results, json.loads(args.compare.read_text()), args.tolerance
+        )
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""Local stand-in for the Hero Labs cloud API.
+
+Serves the endpoints used by the herolabsapi library for any number of
+accounts, properties and Sonic devices, with configurable latency, error
+rate and rate limiting, and counts every request it answers."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+import random
+import time
+from typing import Any
+import uuid
+
+from aiohttp import web
+
+# Seconds between telemetry reports of a simulated Sonic.
+TELEMETRY_INTERVAL = 60
+# Seconds a simulated valve takes to open or close.
+VALVE_TRAVEL_TIME = 5.0
+
+
+@dataclass
+class FakeSonic:
+    """A simulated Sonic device."""
+
+    id: str
+    name: str
+    property_id: str
+    signal_id: str
+    valve_state: str = "open"
+    valve_moved_at: float = 0.0
+    water_flow: int = 0
+    connected: bool = True
+
+    def details(self) -> dict[str, Any]:
+        """Return the device details payload."""
+        if self.valve_state in ("opening", "closing") and (
+            time.monotonic() - self.valve_moved_at >= VALVE_TRAVEL_TIME
+        ):
+            self.valve_state = "open" if self.valve_state == "opening" else "closed"
+        return {
+            "id": self.id,
+            "name": self.name,
+            "serial_no": f"SN-{self.id}",
+            "property_id": self.property_id,
+            "signal_id": self.signal_id,
+            "radio_rssi": -60,
+            "radio_connection": "connected" if self.connected else "disconnected",
+            "battery": "high",
+            "auto_shut_off_enabled": True,
+            "auto_shut_off_time_limit": 3600,
+            "auto_shut_off_volume_limit": 200000,
+            "status": "",
+            "valve_state": self.valve_state,
+        }
+
+    def telemetry(self) -> dict[str, Any]:
+        """Return the latest telemetry payload."""
+        now = int(time.time())
+        return {
+            "probed_at": now - now % TELEMETRY_INTERVAL,
+            "water_flow": self.water_flow,
+            "water_temp": 14.5,
+            "pressure": 3200,
+        }
+
+
+@dataclass
+class FakeProperty:
+    """A simulated property with its settings and notification settings."""
+
+    id: str
+    name: str
+    settings: dict[str, Any] = field(
+        default_factory=lambda: {
+            "auto_shut_off": True,
+            "pressure_tests_enabled": True,
+            "pressure_tests_schedule": "03:00:00",
+            "timezone": "Europe/London",
+            "webhook_enabled": False,
+            "webhook_url": None,
+        }
+    )
+    notifications: dict[str, Any] = field(
+        default_factory=lambda: {
+            "cloud_disconnection": True,
+            "device_handle_moved": True,
+            "health_check_failed": True,
+            "high_volume_threshold_litres": 100,
+            "long_flow_notification_delay_mins": 60,
+            "low_battery_level": True,
+            "pressure_test_failed": True,
+            "pressure_test_skipped": True,
+            "radio_disconnection": True,
+            "legionella_risk": True,
+            "low_water_temperature": True,
+        }
+    )
+
+    def details(self) -> dict[str, Any]:
+        """Return the property details payload."""
+        return {"id": self.id, "name": self.name, "active": True}
+
+
+@dataclass
+class FakeAccount:
+    """A simulated Hero Labs account."""
+
+    email: str
+    password: str
+    user_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    properties: dict[str, FakeProperty] = field(default_factory=dict)
+    sonics: dict[str, FakeSonic] = field(default_factory=dict)
+    signals: dict[str, str] = field(default_factory=dict)
+
+
+class FakeHeroLabsApi:
+    """aiohttp server answering like the Hero Labs cloud."""
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the server.
+
+        latency is added to every request in seconds, error_rate and
+        throttle_rate are the fractions of requests answered with a 500 and
+        a 429 respectively."""
+        self.latency: float = latency
+        self.error_rate: float = error_rate
+        self.throttle_rate: float = throttle_rate
+        self.requests: Counter[str] = Counter()
+        self.accounts: dict[str, FakeAccount] = {}
+        self._tokens: dict[str, FakeAccount] = {}
+        self._random = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self.url: str | None = None
+
+    def add_account(
+        self,
+        email: str,
+        password: str,
+        properties: int = 1,
+        sonics_per_property: int = 1,
+    ) -> FakeAccount:
+        """Add an account with its properties, one Signal hub and Sonics each."""
+        account = FakeAccount(email, password)
+        for property_index in range(properties):
+            prop = FakeProperty(str(uuid.uuid4()), f"Property {property_index + 1}")
+            account.properties[prop.id] = prop
+            signal_id = str(uuid.uuid4())
+            account.signals[signal_id] = prop.id
+            for sonic_index in range(sonics_per_property):
+                sonic = FakeSonic(
+                    str(uuid.uuid4()),
+                    f"Sonic {property_index + 1}.{sonic_index + 1}",
+                    prop.id,
+                    signal_id,
+                )
+                account.sonics[sonic.id] = sonic
+        self.accounts[email] = account
+        return account
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL to use as BASE_RESOURCE."""
+        app = web.Application(middlewares=[self._middleware])
+        app.add_routes(
+            [
+                web.post("/user-service/auth/sign_in", self._sign_in),
+                web.get("/ape/v1/sonics/", self._list_sonics),
+                web.get("/ape/v1/sonics/{id}", self._get_sonic),
+                web.get("/ape/v1/sonics/{id}/telemetry", self._get_telemetry),
+                web.put("/ape/v1/sonics/{id}/valve", self._put_valve),
+                web.get("/ape/v1/properties/", self._list_properties),
+                web.get("/ape/v1/properties/{id}", self._get_property),
+                web.get("/ape/v1/properties/{id}/settings", self._get_settings),
+                web.put("/ape/v1/properties/{id}/settings", self._put_settings),
+                web.get("/ape/v1/properties/{id}/notifications", self._get_notifications),
+                web.put("/ape/v1/properties/{id}/notifications", self._put_notifications),
+                web.get("/ape/v1/signals/", self._list_signals),
+                web.get("/ape/v1/signals/{id}", self._get_signal),
+            ]
+        )
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}/"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        """Count the request, apply latency, injected failures and auth."""
+        route = request.match_info.route.resource
+        name = f"{request.method} {route.canonical if route else request.path}"
+        self.requests[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        roll = self._random.random()
+        if roll < self.throttle_rate:
+            return web.json_response({"message": "Too Many Requests"}, status=429)
+        if roll < self.throttle_rate + self.error_rate:
+            return web.json_response({"message": "Internal Server Error"}, status=500)
+        if request.path != "/user-service/auth/sign_in":
+            token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            if (account := self._tokens.get(token)) is None:
+                # The cloud answers expired tokens without a JSON body.
+                return web.Response(status=401, text="Unauthorized")
+            request["account"] = account
+        return await handler(request)
+
+    async def _sign_in(self, request: web.Request) -> web.Response:
+        """Log in and hand out a token."""
+        credentials = await request.json()
+        account = self.accounts.get(credentials.get("email"))
+        if account is None or account.password != credentials.get("password"):
+            return web.Response(status=401, text="Unauthorized")
+        token = uuid.uuid4().hex
+        self._tokens[token] = account
+        return web.json_response(
+            {"token_details": token, "user_details": {"id": account.user_id}}
+        )
+
+    @staticmethod
+    def _listing(items: list[dict[str, Any]]) -> web.Response:
+        """Return a paginated listing payload."""
+        return web.json_response({"data": items, "total_entries": len(items)})
+
+    @staticmethod
+    def _lookup(request: web.Request, collection: str) -> Any:
+        """Return the object of the account named in the URL."""
+        try:
+            return getattr(request["account"], collection)[request.match_info["id"]]
+        except KeyError:
+            raise web.HTTPNotFound(
+                text='{"message": "Not found"}', content_type="application/json"
+            ) from None
+
+    async def _list_sonics(self, request: web.Request) -> web.Response:
+        return self._listing(
+            [sonic.details() for sonic in request["account"].sonics.values()]
+        )
+
+    async def _get_sonic(self, request: web.Request) -> web.Response:
+        return web.json_response(self._lookup(request, "sonics").details())
+
+    async def _get_telemetry(self, request: web.Request) -> web.Response:
+        return web.json_response(self._lookup(request, "sonics").telemetry())
+
+    async def _put_valve(self, request: web.Request) -> web.Response:
+        sonic: FakeSonic = self._lookup(request, "sonics")
+        action = (await request.json())["action"]
+        sonic.valve_state = "opening" if action == "open" else "closing"
+        sonic.valve_moved_at = time.monotonic()
+        # The cloud acknowledges valve commands without a JSON body.
+        return web.Response(status=200, text="")
+
+    async def _list_properties(self, request: web.Request) -> web.Response:
+        return self._listing(
+            [prop.details() for prop in request["account"].properties.values()]
+        )
+
+    async def _get_property(self, request: web.Request) -> web.Response:
+        return web.json_response(self._lookup(request, "properties").details())
+
+    async def _get_settings(self, request: web.Request) -> web.Response:
+        return web.json_response(self._lookup(request, "properties").settings)
+
+    async def _put_settings(self, request: web.Request) -> web.Response:
+        prop: FakeProperty = self._lookup(request, "properties")
+        prop.settings.update(await request.json())
+        return web.json_response(prop.settings)
+
+    async def _get_notifications(self, request: web.Request) -> web.Response:
+        return web.json_response(self._lookup(request, "properties").notifications)
+
+    async def _put_notifications(self, request: web.Request) -> web.Response:
+        prop: FakeProperty = self._lookup(request, "properties")
+        prop.notifications.update(await request.json())
+        return web.json_response(prop.notifications)
+
+    async def _list_signals(self, request: web.Request) -> web.Response:
+        return self._listing(
+            [
+                {"id": signal_id, "property_id": property_id, "name": "Signal"}
+                for signal_id, property_id in request["account"].signals.items()
+            ]
+        )
+
+    async def _get_signal(self, request: web.Request) -> web.Response:
+        property_id = self._lookup(request, "signals")
+        return web.json_response(
+            {"id": request.match_info["id"], "property_id": property_id, "name": "Signal"}
+        )
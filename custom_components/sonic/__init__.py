@@ -1,72 +1,282 @@
 """The Sonic Water Shut-off Valve integration."""
 import logging
 import asyncio
+from datetime import timedelta
+from typing import Any
 
-from herolabsapi import (
-    InvalidCredentialsError,
-    Client,
-    ServiceUnavailableError,
-    TooManyRequestsError,
-)
+from herolabsapi import InvalidCredentialsError, Client
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import CLIENT, DOMAIN
-from .device import SonicDeviceDataUpdateCoordinator
+from .const import (
+    CLIENT,
+    CONF_LONG_STATISTICS_WINDOW,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_REQUEST_RATE,
+    CONF_SETUP_TIMEOUT,
+    CONF_SHORT_STATISTICS_WINDOW,
+    DEFAULT_LONG_STATISTICS_WINDOW,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_REQUEST_RATE,
+    DEFAULT_SETUP_TIMEOUT,
+    DEFAULT_SHORT_STATISTICS_WINDOW,
+    DOMAIN,
+    SETUP_REFRESH_WORKERS,
+)
+from .auth import SonicSession
+from .coordinator import API_ERRORS, SonicDataUpdateCoordinator
+from .device import SonicDeviceDataUpdateCoordinator, SonicFleetDataUpdateCoordinator
 from .property import PropertyDataUpdateCoordinator
+from .scheduler import RequestPriority, SonicRequestScheduler
+from .services import async_setup_services
+from .store import SonicStateCache, SonicStateStore
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[str] = ["switch", "sensor", "binary_sensor"]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services of the Sonic integration."""
+    async_setup_services(hass)
+    return True
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Sonic Water Shut-off Valve from a config entry."""
+    """Set up Sonic Water Shut-off Valve from a config entry.
+
+    When a previous run cached the last known state, entities are built from
+    it straight away and the cloud is contacted in the background. Otherwise
+    every device and property is refreshed by a small pool of workers, and
+    entities are added once they are all loaded or the setup timeout passes,
+    whichever comes first. The rest fill in as their refresh completes."""
     session = async_get_clientsession(hass)
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {}
-    try:
-        hass.data[DOMAIN][entry.entry_id][CLIENT] = client = await Client.async_login(
-            entry.data[CONF_USERNAME], entry.data[CONF_PASSWORD], session=session
-        )
-    except InvalidCredentialsError as err:
-        raise ConfigEntryNotReady from err
-
-    sonic_data = await client.sonic.async_get_all_sonic_details()
+    hass.data[DOMAIN][entry.entry_id][CLIENT] = client = Client(session=session)
+    hass.data[DOMAIN][entry.entry_id]["session"] = sonic_session = SonicSession(
+        hass, entry, client
+    )
+    hass.data[DOMAIN][entry.entry_id]["options"] = dict(entry.options)
+    sonic_session.async_restore()
+    entry.async_on_unload(sonic_session.async_stop)
+    hass.data[DOMAIN][entry.entry_id]["scheduler"] = scheduler = SonicRequestScheduler(
+        rate=entry.options.get(CONF_REQUEST_RATE, DEFAULT_REQUEST_RATE)
+    )
+    hass.data[DOMAIN][entry.entry_id]["store"] = store = SonicStateStore(
+        hass, entry.entry_id
+    )
+    entry.async_on_unload(scheduler.async_shutdown)
 
-    _LOGGER.debug("Sonic device data information: %s", sonic_data)
+    if (cache := await store.async_load()) is None:
+        try:
+            sonic_data, property_data = await _async_login_and_list(
+                sonic_session, scheduler
+            )
+        except (InvalidCredentialsError, *API_ERRORS) as err:
+            raise ConfigEntryNotReady from err
+        property_ids = [property["id"] for property in property_data["data"]]
+    else:
+        property_ids = list(cache["properties"])
+        updated_at = cache.get("updated_at", {})
 
-    hass.data[DOMAIN][entry.entry_id]["devices"] = devices = [
-        SonicDeviceDataUpdateCoordinator(hass, client, device["id"])
-        for device in sonic_data["data"]
+    min_interval = timedelta(
+        seconds=entry.options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL)
+    )
+    max_interval = timedelta(
+        seconds=entry.options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL)
+    )
+    statistics_windows = [
+        timedelta(
+            minutes=entry.options.get(
+                CONF_SHORT_STATISTICS_WINDOW, DEFAULT_SHORT_STATISTICS_WINDOW
+            )
+        ),
+        timedelta(
+            minutes=entry.options.get(
+                CONF_LONG_STATISTICS_WINDOW, DEFAULT_LONG_STATISTICS_WINDOW
+            )
+        ),
     ]
 
-    sonic_task = [device.async_refresh() for device in devices]
-
-    property_data = await client.property.async_get_all_property_details()
+    hass.data[DOMAIN][entry.entry_id]["fleet"] = fleet = SonicFleetDataUpdateCoordinator(
+        hass, client, scheduler, min_interval, max_interval
+    )
+    if cache is None:
+        fleet.async_set_fleet_information(sonic_data)
+    else:
+        fleet.async_restore_fleet_information(
+            cache["devices"], updated_at.get("fleet", {})
+        )
 
-    _LOGGER.debug("Sonic property data information: %s", property_data)
+    hass.data[DOMAIN][entry.entry_id]["devices"] = devices = [
+        SonicDeviceDataUpdateCoordinator(
+            hass,
+            client,
+            scheduler,
+            device_id,
+            fleet,
+            min_interval,
+            max_interval,
+            statistics_windows,
+        )
+        for device_id in fleet.device_ids
+    ]
 
     hass.data[DOMAIN][entry.entry_id]["properties"] = properties = [
-        PropertyDataUpdateCoordinator(hass, client, property["id"])
-        for property in property_data["data"]
+        PropertyDataUpdateCoordinator(hass, client, scheduler, property_id)
+        for property_id in property_ids
     ]
+    properties_by_id = {property.id: property for property in properties}
+    for device in devices:
+        if (property := properties_by_id.get(device.property_id)) is not None:
+            device.async_set_property(property)
+
+    if cache is None:
+        for details in property_data["data"]:
+            properties_by_id[details["id"]].async_set_property_information(details)
+        # Properties first, their settings are read by the device entities.
+        initial_refresh = entry.async_create_background_task(
+            hass,
+            _async_refresh_coordinators([*properties, *devices]),
+            f"{DOMAIN} {entry.title} initial refresh",
+        )
+        setup_timeout = entry.options.get(CONF_SETUP_TIMEOUT, DEFAULT_SETUP_TIMEOUT)
+        await asyncio.wait({initial_refresh}, timeout=setup_timeout)
+        if not initial_refresh.done():
+            _LOGGER.info(
+                "Loaded %d of %d Sonic devices and properties within %d seconds,"
+                " loading the rest in the background",
+                sum(
+                    1
+                    for coordinator in (*properties, *devices)
+                    if coordinator.section_updated_at
+                ),
+                len(properties) + len(devices),
+                setup_timeout,
+            )
+    else:
+        for property in properties:
+            property.async_restore_sections(
+                cache["properties"][property.id], updated_at.get(property.id, {})
+            )
+        for device in devices:
+            device.async_restore_telemetry(
+                cache["telemetry"].get(device.id, {}), updated_at.get(device.id, {})
+            )
 
-    property_task = [property.async_refresh() for property in properties]
+    entry.async_on_unload(store.async_track(fleet, devices, properties))
+    store.async_schedule_save()
 
-    await asyncio.gather(*sonic_task, *property_task)
-    
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    
+
+    if cache is not None:
+        entry.async_create_background_task(
+            hass,
+            _async_refresh_cached_entry(hass, entry, cache),
+            f"{DOMAIN} {entry.title} startup refresh",
+        )
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
+async def _async_login_and_list(
+    sonic_session: SonicSession, scheduler: SonicRequestScheduler
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """List the Sonic devices and properties, logging in without a valid token."""
+    client = sonic_session.client
+    # pylint: disable-next=protected-access
+    if not client._token:
+        await sonic_session.async_login()
+    sonic_data, property_data = await asyncio.gather(
+        scheduler.async_request(
+            RequestPriority.TELEMETRY, client.sonic.async_get_all_sonic_details
+        ),
+        scheduler.async_request(
+            RequestPriority.PROPERTY, client.property.async_get_all_property_details
+        ),
+    )
+    _LOGGER.debug(
+        "Found %d Sonic devices and %d properties",
+        len(sonic_data["data"]),
+        len(property_data["data"]),
+    )
+    return sonic_data, property_data
+
+
+async def _async_refresh_cached_entry(
+    hass: HomeAssistant, entry: ConfigEntry, cache: SonicStateCache
+) -> None:
+    """Replace the cached state of a config entry with fresh cloud data."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    try:
+        sonic_data, property_data = await _async_login_and_list(
+            entry_data["session"], entry_data["scheduler"]
+        )
+    except (InvalidCredentialsError, *API_ERRORS) as err:
+        _LOGGER.warning(
+            "Unable to reach the Hero Labs cloud, showing cached Sonic state: %s", err
+        )
+        return
+
+    fleet: SonicFleetDataUpdateCoordinator = entry_data["fleet"]
+    property_ids = {property["id"] for property in property_data["data"]}
+    if set(fleet.device_ids) != {
+        device["id"] for device in sonic_data["data"]
+    } or property_ids != set(cache["properties"]):
+        _LOGGER.info("Sonic devices or properties changed, reloading")
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+        return
+
+    fleet.async_set_fleet_information(sonic_data)
+    fleet.async_set_updated_data(None)
+    await _async_refresh_coordinators(
+        [*entry_data["properties"], *entry_data["devices"]]
+    )
+
+
+async def _async_refresh_coordinators(
+    coordinators: list[SonicDataUpdateCoordinator],
+) -> None:
+    """Refresh coordinators in order, a few at a time."""
+    pending = iter(coordinators)
+
+    async def worker() -> None:
+        for coordinator in pending:
+            await coordinator.async_refresh()
+
+    await asyncio.gather(
+        *[worker() for _ in range(min(SETUP_REFRESH_WORKERS, len(coordinators)))]
+    )
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change.
+
+    Storing a renewed token also updates the entry, which must not reload it."""
+    if entry.options != hass.data[DOMAIN][entry.entry_id]["options"]:
+        await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached state of a deleted config entry."""
+    await SonicStateStore(hass, entry.entry_id).async_remove()
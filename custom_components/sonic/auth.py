@@ -0,0 +1,124 @@
+"""Authentication helpers for the Hero Labs API client."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from herolabsapi import Client, InvalidCredentialsError
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_TOKEN,
+    CONF_TOKEN_EXPIRES_AT,
+    CONF_USER_ID,
+    LOGGER,
+)
+from .coordinator import API_ERRORS
+
+# Hero Labs tokens are valid for two weeks, they are renewed a day early.
+TOKEN_LIFETIME = timedelta(days=14)
+TOKEN_RENEW_BEFORE = timedelta(days=1)
+RENEW_RETRY_INTERVAL = timedelta(hours=1)
+
+
+def session_data(client: Client) -> dict[str, Any]:
+    """Return the token of a logged in client as config entry data."""
+    # pylint: disable=protected-access
+    return {
+        CONF_TOKEN: client._token,
+        CONF_USER_ID: client._user_id,
+        CONF_TOKEN_EXPIRES_AT: (dt_util.utcnow() + TOKEN_LIFETIME).timestamp(),
+    }
+
+
+class SonicSession:
+    """Keep the API token of a config entry valid across restarts.
+
+    The token is stored in the config entry and reused until it is about to
+    expire, then renewed in the background with a separate login so polls
+    never run with a missing or expired token."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, client: Client) -> None:
+        """Initialize the session."""
+        self.hass: HomeAssistant = hass
+        self.entry: ConfigEntry = entry
+        self.client: Client = client
+        self._unsub_renew: CALLBACK_TYPE | None = None
+        # pylint: disable=protected-access
+        client._email = entry.data[CONF_USERNAME]
+        client._password = entry.data[CONF_PASSWORD]
+
+    @property
+    def renew_at(self) -> datetime | None:
+        """Return when the stored token should be renewed."""
+        if not self.entry.data.get(CONF_TOKEN):
+            return None
+        expires_at = dt_util.utc_from_timestamp(self.entry.data[CONF_TOKEN_EXPIRES_AT])
+        return expires_at - TOKEN_RENEW_BEFORE
+
+    @callback
+    def async_restore(self) -> bool:
+        """Reuse the stored token, returning False when a login is needed."""
+        renew_at = self.renew_at
+        if renew_at is None or renew_at <= dt_util.utcnow():
+            return False
+        # pylint: disable=protected-access
+        self.client._token = self.entry.data[CONF_TOKEN]
+        self.client._user_id = self.entry.data[CONF_USER_ID]
+        self._async_schedule_renew(renew_at)
+        return True
+
+    async def async_login(self) -> None:
+        """Log in with the stored credentials and store the new token."""
+        await self.client.async_authenticate()
+        self._async_save()
+        self._async_schedule_renew(self.renew_at)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop renewing and keep any token the library renewed by itself."""
+        if self._unsub_renew is not None:
+            self._unsub_renew()
+            self._unsub_renew = None
+        # pylint: disable=protected-access
+        if self.client._token and self.client._token != self.entry.data.get(CONF_TOKEN):
+            self._async_save()
+
+    @callback
+    def _async_save(self) -> None:
+        """Store the token of the client in the config entry."""
+        self.hass.config_entries.async_update_entry(
+            self.entry, data={**self.entry.data, **session_data(self.client)}
+        )
+
+    @callback
+    def _async_schedule_renew(self, renew_at: datetime) -> None:
+        """Schedule the background renewal of the token."""
+        if self._unsub_renew is not None:
+            self._unsub_renew()
+        self._unsub_renew = async_track_point_in_utc_time(
+            self.hass, self._async_renew, renew_at
+        )
+
+    async def _async_renew(self, _now: datetime) -> None:
+        """Swap in a fresh token obtained by a separate login."""
+        self._unsub_renew = None
+        fresh = Client(session=async_get_clientsession(self.hass))
+        # pylint: disable=protected-access
+        fresh._email = self.client._email
+        fresh._password = self.client._password
+        try:
+            await fresh.async_authenticate()
+        except (InvalidCredentialsError, *API_ERRORS) as err:
+            LOGGER.warning("Unable to renew the Hero Labs token, retrying: %s", err)
+            self._async_schedule_renew(dt_util.utcnow() + RENEW_RETRY_INTERVAL)
+            return
+        self.client._token = fresh._token
+        self._async_save()
+        self._async_schedule_renew(self.renew_at)
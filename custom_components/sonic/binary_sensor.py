@@ -8,12 +8,19 @@ from homeassistant.components.binary_sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN as SONIC_DOMAIN
 from .device import SonicDeviceDataUpdateCoordinator
 from .entity import SonicEntity
+from .leak import LeakProblem
 
 NAME_AUTO_SHUT_OFF_ENABLED = "Auto Shut Off Enabled Status"
+NAME_LEAK_PROBLEMS = {
+    LeakProblem.CONTINUOUS_LOW_FLOW: "Continuous Low Flow",
+    LeakProblem.LONG_FLOW: "Long Flow",
+    LeakProblem.HIGH_VOLUME: "High Volume Flow",
+}
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -28,6 +35,9 @@ async def async_setup_entry(
     for device in devices:
 #        entities.append(SonicOpenIncidentsBinarySensor(device))
         entities.append(SonicAutoShutOffEnabledSensor(device))
+        entities.extend(
+            SonicLeakBinarySensor(device, problem) for problem in LeakProblem
+        )
     async_add_entities(entities)
 
 
@@ -60,6 +70,8 @@ class SonicAutoShutOffEnabledSensor(SonicEntity, BinarySensorEntity):
     """Binary sensor that reports if the auto shut off feature is enabled."""
 
     _attr_device_class = BinarySensorDeviceClass.RUNNING
+    _configuration_entity = True
+    _source_fields = ("auto_shut_off_enabled",)
 
     def __init__(self, device):
         """Initialize the pending alerts binary sensor."""
@@ -68,4 +80,33 @@ class SonicAutoShutOffEnabledSensor(SonicEntity, BinarySensorEntity):
     @property
     def is_on(self):
         """Return true if the auto shut off feature is enabled."""
-        return self._device.auto_shut_off_enabled
+        return self._device.configuration.auto_shut_off_enabled
+
+
+class SonicLeakBinarySensor(SonicEntity, BinarySensorEntity):
+    """Binary sensor that reports a problem raised by the local leak detector."""
+
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    _source_fields = ("leak",)
+
+    def __init__(self, device, problem: LeakProblem):
+        """Initialize the leak binary sensor."""
+        super().__init__(problem.value, NAME_LEAK_PROBLEMS[problem], device)
+        self._problem: LeakProblem = problem
+
+    @property
+    def is_on(self):
+        """Return true if the leak detector raised the problem."""
+        return self._problem in self._device.leak_detector.problems
+
+    @property
+    def extra_state_attributes(self):
+        """Return when the flow that raised the problem started."""
+        if not self.is_on:
+            return self._stale_attributes
+        return {
+            "flow_started_at": dt_util.utc_from_timestamp(
+                self._device.leak_detector.flow_started_at
+            ),
+            **self._stale_attributes,
+        }
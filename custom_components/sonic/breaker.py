@@ -0,0 +1,113 @@
+"""Circuit breaker guarding a Hero Labs account against cloud outages."""
+from __future__ import annotations
+
+from datetime import datetime
+from enum import StrEnum
+
+from herolabsapi.errors import ServiceUnavailableError
+
+from homeassistant.util import dt as dt_util
+
+from .const import LOGGER
+
+# Consecutive failed requests, with no success in between, opening the circuit.
+BREAKER_FAILURE_THRESHOLD = 5
+# Seconds before the first probe once open, doubled after every failed probe
+# up to the maximum.
+BREAKER_PROBE_DELAY_MIN = 30.0
+BREAKER_PROBE_DELAY_MAX = 900.0
+
+
+class BreakerState(StrEnum):
+    """State of the circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ServiceUnavailableError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Stop requests to the cloud while it is down.
+
+    The circuit opens after a number of consecutive failures, or straight
+    away when the cloud reports itself unavailable. While open every request
+    fails without being sent, except a single probe let through on an
+    exponential schedule. A successful request closes the circuit again."""
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        probe_delay_min: float = BREAKER_PROBE_DELAY_MIN,
+        probe_delay_max: float = BREAKER_PROBE_DELAY_MAX,
+    ) -> None:
+        """Initialize a closed circuit."""
+        self._failure_threshold: int = failure_threshold
+        self._probe_delay_min: float = probe_delay_min
+        self._probe_delay_max: float = probe_delay_max
+        self._probe_delay: float = 0.0
+        self._probe_at: float = 0.0
+        self.state: BreakerState = BreakerState.CLOSED
+        self.failures: int = 0
+        self.opened_at: datetime | None = None
+        """Time the circuit last opened, None while closed."""
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while requests are held back."""
+        return self.state is not BreakerState.CLOSED
+
+    def allow_request(self, now: float) -> bool:
+        """Return True if a request may be sent at a monotonic time, making it
+        the probe when the circuit is open and a probe is due."""
+        if self.state is BreakerState.CLOSED:
+            return True
+        if self.state is BreakerState.OPEN and now >= self._probe_at:
+            self.state = BreakerState.HALF_OPEN
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Record a request answered by the cloud."""
+        self.failures = 0
+        if self.state is BreakerState.CLOSED:
+            return
+        LOGGER.info("Hero Labs cloud is reachable again, resuming requests")
+        self.state = BreakerState.CLOSED
+        self.opened_at = None
+        self._probe_delay = 0.0
+
+    def record_failure(self, now: float, error: Exception) -> None:
+        """Record a request that failed at a monotonic time."""
+        self.failures += 1
+        if self.state is BreakerState.HALF_OPEN:
+            self._open(now)
+        elif self.state is BreakerState.CLOSED and (
+            isinstance(error, ServiceUnavailableError)
+            or self.failures >= self._failure_threshold
+        ):
+            self.opened_at = dt_util.utcnow()
+            self._open(now)
+
+    def release_probe(self, now: float) -> None:
+        """Give up a probe that ended without an answer either way."""
+        if self.state is BreakerState.HALF_OPEN:
+            self.state = BreakerState.OPEN
+            self._probe_at = now
+
+    def _open(self, now: float) -> None:
+        """Open the circuit until the next probe."""
+        self._probe_delay = min(
+            max(self._probe_delay * 2, self._probe_delay_min), self._probe_delay_max
+        )
+        self._probe_at = now + self._probe_delay
+        self.state = BreakerState.OPEN
+        LOGGER.warning(
+            "Hero Labs cloud is unreachable after %d failed requests, probing"
+            " again in %.0f seconds",
+            self.failures,
+            self._probe_delay,
+        )
@@ -4,9 +4,26 @@ import voluptuous as vol
 
 from homeassistant import config_entries, core, exceptions
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN, LOGGER
+from .auth import session_data
+from .const import (
+    CONF_LONG_STATISTICS_WINDOW,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_REQUEST_RATE,
+    CONF_SETUP_TIMEOUT,
+    CONF_SHORT_STATISTICS_WINDOW,
+    DEFAULT_LONG_STATISTICS_WINDOW,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_REQUEST_RATE,
+    DEFAULT_SETUP_TIMEOUT,
+    DEFAULT_SHORT_STATISTICS_WINDOW,
+    DOMAIN,
+    LOGGER,
+)
 
 DATA_SCHEMA = vol.Schema({vol.Required(CONF_USERNAME): str, vol.Required(CONF_PASSWORD): str})
 
@@ -31,6 +48,8 @@ async def validate_input(hass: core.HomeAssistant, data):
     # Use the verified session to discover the first sonic device's name
     await api.sonic.async_get_all_sonic_details()
     await api.property.async_get_all_property_details()
+    # Keep the token so setting up the entry does not log in a second time
+    return session_data(api)
 #    first_sonic_id = sonic_data["data"][0]["id"]
 #    sonic_info = await api.sonic.async_get_sonic_details(first_sonic_id)
 #    return {"title": f'Sonic Device {sonic_info["name"]}'}
@@ -49,7 +68,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             try:
                 info = await validate_input(self.hass, user_input)
 
-                return self.async_create_entry(title="Sonic", data=user_input)
+                return self.async_create_entry(title="Sonic", data={**user_input, **info})
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except InvalidHost:
@@ -62,6 +81,69 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=DATA_SCHEMA, errors=errors
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Sonic options."""
+
+    def __init__(self, config_entry):
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the polling, statistics and setup options."""
+        errors = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_POLL_INTERVAL] > user_input[CONF_MAX_POLL_INTERVAL]:
+                errors["base"] = "invalid_poll_interval"
+            elif (
+                user_input[CONF_SHORT_STATISTICS_WINDOW]
+                >= user_input[CONF_LONG_STATISTICS_WINDOW]
+            ):
+                errors["base"] = "invalid_statistics_window"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_MIN_POLL_INTERVAL,
+                    default=options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                vol.Required(
+                    CONF_MAX_POLL_INTERVAL,
+                    default=options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=3600)),
+                vol.Required(
+                    CONF_SHORT_STATISTICS_WINDOW,
+                    default=options.get(
+                        CONF_SHORT_STATISTICS_WINDOW, DEFAULT_SHORT_STATISTICS_WINDOW
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1440)),
+                vol.Required(
+                    CONF_LONG_STATISTICS_WINDOW,
+                    default=options.get(
+                        CONF_LONG_STATISTICS_WINDOW, DEFAULT_LONG_STATISTICS_WINDOW
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1440)),
+                vol.Required(
+                    CONF_SETUP_TIMEOUT,
+                    default=options.get(CONF_SETUP_TIMEOUT, DEFAULT_SETUP_TIMEOUT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=600)),
+                vol.Required(
+                    CONF_REQUEST_RATE,
+                    default=options.get(CONF_REQUEST_RATE, DEFAULT_REQUEST_RATE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=50)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=data_schema, errors=errors)
+
 
 class CannotConnect(exceptions.HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -5,3 +5,46 @@ LOGGER = logging.getLogger(__package__)
 
 CLIENT = "client"
 DOMAIN = "sonic"
+
+# Deadline in seconds applied to each individual API request.
+REQUEST_TIMEOUT = 10
+
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+
+# Poll interval limits in seconds, used while water flows and while idle.
+DEFAULT_MIN_POLL_INTERVAL = 20
+DEFAULT_MAX_POLL_INTERVAL = 600
+
+CONF_SHORT_STATISTICS_WINDOW = "short_statistics_window"
+CONF_LONG_STATISTICS_WINDOW = "long_statistics_window"
+
+# Rolling statistics windows in minutes.
+DEFAULT_SHORT_STATISTICS_WINDOW = 15
+DEFAULT_LONG_STATISTICS_WINDOW = 1440
+
+CONF_SETUP_TIMEOUT = "setup_timeout"
+CONF_REQUEST_RATE = "request_rate"
+
+# Seconds the setup waits for the first refresh of every device and property
+# before adding the entities with whatever has loaded.
+DEFAULT_SETUP_TIMEOUT = 30
+
+# Sustained API requests per second of an account. Hero Labs does not publish
+# a rate limit, so the default is conservative and left to the options. A
+# cold setup sends about one request per device and three per property, and
+# past the burst of the request scheduler it takes roughly
+# (requests - burst) / rate seconds: around 15 seconds for 50 devices, but
+# well over the setup timeout for several hundred. Entities not loaded by the
+# deadline start unavailable and fill in from the background refresh.
+DEFAULT_REQUEST_RATE = 5.0
+
+# Coordinators refreshed at once while setting up.
+SETUP_REFRESH_WORKERS = 10
+
+# Fired when the local leak detector raises a problem for a device.
+EVENT_LEAK_DETECTED = f"{DOMAIN}_leak_detected"
+
+CONF_TOKEN = "token"
+CONF_TOKEN_EXPIRES_AT = "token_expires_at"
+CONF_USER_ID = "user_id"
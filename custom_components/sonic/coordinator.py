@@ -0,0 +1,327 @@
+"""Base coordinator shared by the Sonic fleet, device and property objects."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+import time
+from typing import Any, NamedTuple, TypeVar
+
+from aiohttp import ClientError
+from herolabsapi.errors import (
+    RequestError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
+)
+
+from homeassistant.core import callback
+from homeassistant.helpers import event
+from homeassistant.helpers.update_coordinator import (
+    REQUEST_REFRESH_DEFAULT_COOLDOWN,
+    DataUpdateCoordinator,
+)
+from homeassistant.util import dt as dt_util
+
+from .instrumentation import RequestInstrumentation
+from .polling import RETRY_DELAY_MIN, DecorrelatedBackoff, next_phase_time
+from .scheduler import RequestPriority, SonicRequestScheduler
+
+_T = TypeVar("_T")
+
+# Update cycles kept per coordinator for the diagnostics download.
+TRACE_LENGTH = 10
+
+# Refresh requests made within this delay of the first one share its fetch.
+REFRESH_COALESCE_DELAY = timedelta(milliseconds=100)
+# Least time between the end of a refresh and a requested one, like the
+# cooldown of the request refresh debouncer of Home Assistant.
+REFRESH_COOLDOWN = timedelta(seconds=REQUEST_REFRESH_DEFAULT_COOLDOWN)
+
+# Update intervals after which data not refreshed since is stale, unless an
+# entity sets its own threshold.
+STALE_AFTER_INTERVALS = 3
+
+# Errors raised when the cloud cannot serve a request, turned into
+# UpdateFailed by the coordinators.
+API_ERRORS = (
+    RequestError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
+    asyncio.TimeoutError,
+    ClientError,
+)
+
+
+def changed_fields(previous: Any, current: Any) -> set[str]:
+    """Return the fields whose value differs between two slotted snapshots."""
+    return {
+        field
+        for field in current.__slots__
+        if getattr(previous, field) != getattr(current, field)
+    }
+
+
+class RequestTrace(NamedTuple):
+    """A request made during an update cycle."""
+
+    endpoint: str
+    duration: float
+    """Seconds from queueing the request to its response."""
+    latency: float | None
+    """Seconds the request itself took, excluding the queue."""
+    outcome: str
+    payload: Any
+
+
+class UpdateCycleTrace:
+    """Timings, requests and outcome of one update cycle."""
+
+    __slots__ = (
+        "started_at",
+        "duration",
+        "success",
+        "error",
+        "changed_fields",
+        "requests",
+    )
+
+    def __init__(self, started_at: datetime) -> None:
+        """Initialize the trace of a cycle starting now."""
+        self.started_at: datetime = started_at
+        self.duration: float | None = None
+        self.success: bool | None = None
+        self.error: str | None = None
+        self.changed_fields: set[str] | None = None
+        self.requests: list[RequestTrace] = []
+
+
+class SonicDataUpdateCoordinator(DataUpdateCoordinator):
+    """Base class for the Sonic coordinators.
+
+    Listeners may pass the snapshot fields they read as their context, they
+    are then only called when one of those fields changed or availability
+    flipped. Listeners without a context are called on every update.
+
+    Every update cycle is timed and the requests it makes are instrumented,
+    the "timing" context is notified after each cycle. The last cycles are
+    traced for diagnostics, keeping references to the payloads received so
+    nothing is serialized unless diagnostics are downloaded.
+
+    Refresh requests, from entities being updated for instance, are gated:
+    every request made while one is pending or in flight waits for that
+    same refresh instead of queueing its own, and a requested refresh waits
+    out a cooldown after the previous one.
+
+    The time each section of the data was last fetched is kept, entities stay
+    available until the sections they read are stale rather than on the
+    first failed request. Every listener is called after a failed update so
+    entities can check their sections.
+
+    Polls land on a phase of the update interval set per coordinator, so
+    the coordinators of a large account poll as a steady stream rather than
+    all at once, and failed updates are retried after a jittered backoff."""
+
+    scheduler: SonicRequestScheduler
+    _request_priority = RequestPriority.TELEMETRY
+    # Fields changed by the last update, None when every listener is due.
+    _changed_fields: set[str] | None = None
+    _notified_success: bool | None = None
+    _update_started: float | None = None
+    # Loop time the last refresh ended at.
+    _refreshed_at: float | None = None
+    # Fraction of the update interval the polls are shifted by, None to poll
+    # a whole interval after the previous update.
+    _phase: float | None = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the coordinator."""
+        super().__init__(*args, **kwargs)
+        self.request_statistics = RequestInstrumentation()
+        self.last_update_duration: float | None = None
+        self.trace: deque[UpdateCycleTrace] = deque(maxlen=TRACE_LENGTH)
+        self._cycle: UpdateCycleTrace | None = None
+        self._requested_refresh: asyncio.Task[None] | None = None
+        self.section_updated_at: dict[str, datetime] = {}
+        self._retry_backoff = DecorrelatedBackoff(
+            self.update_interval or RETRY_DELAY_MIN
+        )
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh data, timing the cycle until listeners are notified."""
+        self._update_started = time.monotonic()
+        self._cycle = UpdateCycleTrace(dt_util.utcnow())
+        await super()._async_refresh(*args, **kwargs)
+        self._refreshed_at = self.hass.loop.time()
+        if self._update_started is None:
+            return
+        if self._shutdown_requested or self.hass.is_stopping:
+            # The refresh was skipped or its entities are going away, there
+            # is no cycle to record or report.
+            self._update_started = None
+            self._cycle = None
+            self._changed_fields = None
+            return
+        # Listeners are skipped after consecutive failures, yet the cycle
+        # still ends and the sections keep getting older.
+        self.async_update_listeners()
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh on the phase of the coordinator, or after
+        a jittered delay while updates fail."""
+        if self.update_interval is None or (
+            self.config_entry and self.config_entry.pref_disable_polling
+        ):
+            return
+        if self.last_update_success:
+            self._retry_backoff.reset()
+            if self._phase is None:
+                super()._schedule_refresh()
+                return
+        self._async_unsub_refresh()
+        now = self.hass.loop.time()
+        if self.last_update_success:
+            next_refresh = next_phase_time(
+                now, self.update_interval.total_seconds(), self._phase
+            )
+        else:
+            next_refresh = now + self._retry_backoff.next_delay()
+        self._unsub_refresh = event.async_call_at(self.hass, self._job, next_refresh)
+
+    async def async_request_refresh(self) -> None:
+        """Request a refresh and wait for it, sharing it with every other
+        request made until it completes."""
+        if (refresh := self._requested_refresh) is None:
+            refresh = self._requested_refresh = self.hass.async_create_task(
+                self._async_requested_refresh(), f"{self.name} requested refresh"
+            )
+        await asyncio.shield(refresh)
+
+    async def _async_requested_refresh(self) -> None:
+        """Refresh once the requests made at the same time are gathered, and
+        no sooner than the cooldown after the last refresh."""
+        delay = REFRESH_COALESCE_DELAY.total_seconds()
+        if self._refreshed_at is not None:
+            delay = max(
+                delay,
+                self._refreshed_at
+                + REFRESH_COOLDOWN.total_seconds()
+                - self.hass.loop.time(),
+            )
+        try:
+            await asyncio.sleep(delay)
+            await self.async_refresh()
+        finally:
+            self._requested_refresh = None
+
+    async def async_shutdown(self) -> None:
+        """Cancel any requested refresh and scheduled call."""
+        if self._requested_refresh is not None:
+            self._requested_refresh.cancel()
+        await super().async_shutdown()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners whose source fields changed."""
+        changed = self._changed_fields
+        self._changed_fields = None
+        if self._update_started is not None:
+            self.last_update_duration = time.monotonic() - self._update_started
+            self._update_started = None
+            if (cycle := self._cycle) is not None:
+                self._cycle = None
+                cycle.duration = self.last_update_duration
+                cycle.success = self.last_update_success
+                cycle.error = None if self.last_update_success else str(self.last_exception)
+                cycle.changed_fields = changed
+                self.trace.append(cycle)
+            if changed is not None:
+                changed = changed | {"timing"}
+        if self.last_update_success != self._notified_success:
+            self._notified_success = self.last_update_success
+            changed = None
+        elif not self.last_update_success:
+            # Sections age with every failed update.
+            changed = None
+        self._async_notify_listeners(changed)
+
+    @callback
+    def _async_notify_listeners(self, changed: set[str] | None) -> None:
+        """Call the listeners reading any of the changed fields."""
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or not changed.isdisjoint(context):
+                update_callback()
+
+    @callback
+    def _async_section_updated(self, section: str) -> None:
+        """Record that a section of the data was just fetched."""
+        self.section_updated_at[section] = dt_util.utcnow()
+
+    @callback
+    def _async_restore_section_times(self, updated_at: dict[str, str]) -> None:
+        """Restore the fetch times of sections cached by a previous run.
+
+        Caches written before the times were stored have none, their sections
+        stay unavailable until fetched again."""
+        for section, timestamp in updated_at.items():
+            if (parsed := dt_util.parse_datetime(timestamp)) is not None:
+                self.section_updated_at[section] = parsed
+
+    def section_fresh(self, section: str, stale_after: timedelta | None = None) -> bool:
+        """Return True if a section was fetched within the staleness threshold,
+        by default a few update intervals."""
+        if (updated_at := self.section_updated_at.get(section)) is None:
+            return False
+        if stale_after is None:
+            if self.update_interval is None:
+                return True
+            stale_after = self.update_interval * STALE_AFTER_INTERVALS
+        return dt_util.utcnow() - updated_at <= stale_after
+
+    def section_available(self, section: str, stale_after: timedelta | None = None) -> bool:
+        """Return True if a section may be shown: while it is fresh, or at any
+        age while the circuit breaker holds requests back and the last known
+        payload is all there is."""
+        if self.section_fresh(section, stale_after):
+            return True
+        return self.scheduler.breaker.is_open and section in self.section_updated_at
+
+    async def _async_fetch(self, method: Callable[..., Awaitable[_T]], *args: Any) -> _T:
+        """Call a single API endpoint through the account request scheduler."""
+        cycle = self._cycle
+        started = time.monotonic()
+        result: Any = None
+        outcome = "success"
+        try:
+            result = await self.scheduler.async_request(
+                self._request_priority,
+                method,
+                *args,
+                instrumentation=self.request_statistics,
+            )
+        except Exception as err:
+            outcome = type(err).__name__
+            raise
+        finally:
+            if cycle is not None:
+                statistics = self.request_statistics.get(method.__name__)
+                cycle.requests.append(
+                    RequestTrace(
+                        method.__name__,
+                        time.monotonic() - started,
+                        None if statistics is None else statistics.latency_last,
+                        outcome,
+                        result,
+                    )
+                )
+        return result
+
+    @callback
+    def _async_poll_sooner(self, interval: timedelta) -> None:
+        """Shorten the update interval and move the pending poll forward."""
+        if self.update_interval is not None and self.update_interval <= interval:
+            return
+        self.update_interval = interval
+        if self._listeners and self._unsub_refresh:
+            self._schedule_refresh()
@@ -2,53 +2,406 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import timedelta
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo
 from typing import Any
 
-from async_timeout import timeout
 from herolabsapi.client import Client
-from herolabsapi.errors import RequestError
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN as SONIC_DOMAIN, LOGGER
+from .const import DOMAIN as SONIC_DOMAIN, EVENT_LEAK_DETECTED, LOGGER
+from .coordinator import API_ERRORS, SonicDataUpdateCoordinator, changed_fields
+from .history import HISTORY_METRICS, TelemetryHistory
+from .leak import LeakDetector
+from .polling import (
+    ACTIVE_VALVE_STATES,
+    VALVE_FOLLOW_UP_DELAYS,
+    AdaptivePollInterval,
+    ReportCadence,
+    phase_offset,
+)
+from .property import PropertyDataUpdateCoordinator
+from .scheduler import RequestPriority, SonicRequestScheduler
 
+DEFAULT_UPDATE_INTERVAL = timedelta(seconds=120)
+# The fleet details carry the valve state and radio link of every device
+# along with their configuration, so while idle they are polled no further
+# apart than telemetry starts out. A valve moved by hand or from the Hero
+# Labs app, or a lost radio link, shows within this interval.
+FLEET_UPDATE_INTERVAL = DEFAULT_UPDATE_INTERVAL
 
-class SonicDeviceDataUpdateCoordinator(DataUpdateCoordinator):
-    """Sonic device object."""
 
-    def __init__(self, hass: HomeAssistant, api_client: Client, device_id: str) -> None:
+def _round_or_none(value: float | None, divisor: int = 1, digits: int | None = 1) -> Any:
+    """Convert and round a value, passing None through."""
+    if value is None:
+        return None
+    return round(value / divisor, digits)
+
+
+@dataclass(frozen=True, slots=True)
+class SonicTelemetrySnapshot:
+    """Telemetry of a Sonic device, converted once per update."""
+
+    flow_rate: float | None
+    """Water flow rate in litres per minute."""
+    temperature: float | None
+    """Water temperature in degrees C."""
+    pressure: float | None
+    """Water pressure in bar."""
+    probed_at: datetime | None
+    """Time the Sonic took the measurements."""
+
+    @classmethod
+    def from_telemetry(
+        cls, telemetry: dict[str, Any], time_zone: tzinfo
+    ) -> SonicTelemetrySnapshot:
+        """Build the snapshot from a telemetry payload, local to a time zone."""
+        probed_at = telemetry.get("probed_at")
+        return cls(
+            flow_rate=_round_or_none(telemetry.get("water_flow"), 1000),
+            temperature=_round_or_none(telemetry.get("water_temp")),
+            pressure=_round_or_none(telemetry.get("pressure"), 1000),
+            probed_at=(
+                None
+                if probed_at is None
+                else datetime.fromtimestamp(probed_at, time_zone)
+            ),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SonicConfigurationSnapshot:
+    """Configuration and valve state of a Sonic device, converted once per update."""
+
+    connected: bool
+    battery: str | None
+    valve_state: str | None
+    status: str | None
+    auto_shut_off_enabled: bool | None
+    auto_shut_off_time_limit: int | None
+    """Offline auto shut off water usage time limit in minutes."""
+    auto_shut_off_volume_limit: int | None
+    """Offline auto shut off water volume limit in litres."""
+
+    @classmethod
+    def from_details(cls, details: dict[str, Any]) -> SonicConfigurationSnapshot:
+        """Build the snapshot from a device details payload."""
+        return cls(
+            connected=details.get("radio_connection") == "connected",
+            battery=details.get("battery"),
+            valve_state=details.get("valve_state"),
+            status=details.get("status") or None,
+            auto_shut_off_enabled=details.get("auto_shut_off_enabled"),
+            auto_shut_off_time_limit=_round_or_none(
+                details.get("auto_shut_off_time_limit"), 60, None
+            ),
+            auto_shut_off_volume_limit=_round_or_none(
+                details.get("auto_shut_off_volume_limit"), 1000, None
+            ),
+        )
+
+
+class SonicFleetDataUpdateCoordinator(SonicDataUpdateCoordinator):
+    """Sonic fleet object, the device configuration coordinator.
+
+    Fetches the details of every Sonic on the account with a single request
+    and fans them out to the per-device coordinators listening to it. The
+    details hold the valve state and radio link as well as configuration, so
+    they are polled at the telemetry interval while idle and at the poll
+    floor while a valve is moving or water is flowing somewhere.
+
+    Devices are also grouped by the Signal hub they talk through. Telemetry
+    is not fetched for a Sonic without a radio link, the details fetched
+    here are its liveness probe until it reconnects."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_client: Client,
+        scheduler: SonicRequestScheduler,
+        min_interval: timedelta,
+        max_interval: timedelta,
+    ) -> None:
+        """Initialize the fleet."""
+        self.hass: HomeAssistant = hass
+        self.api_client: Client = api_client
+        self.scheduler: SonicRequestScheduler = scheduler
+        self._fleet_information: dict[str, dict[str, Any]] = {}
+        self._active_devices: set[str] = set()
+        self._signal_devices: dict[str | None, list[str]] = {}
+        self.disconnected_signals: set[str | None] = set()
+        self._poll_interval = AdaptivePollInterval(
+            min_interval,
+            min(max_interval, FLEET_UPDATE_INTERVAL),
+            FLEET_UPDATE_INTERVAL,
+        )
+        super().__init__(
+            hass,
+            LOGGER,
+            name=f"{SONIC_DOMAIN}-fleet",
+            update_interval=self._poll_interval.interval,
+        )
+
+    async def _async_update_data(self):
+        """Update data via library."""
+        try:
+            sonic_data = await self._async_fetch(
+                self.api_client.sonic.async_get_all_sonic_details
+            )
+        except API_ERRORS as error:
+            raise UpdateFailed(error) from error
+        self.async_set_fleet_information(sonic_data)
+        self.update_interval = self._poll_interval.next_interval(self.is_active)
+
+    @property
+    def device_ids(self) -> list[str]:
+        """Return the ids of every Sonic device on the account."""
+        return list(self._fleet_information)
+
+    @property
+    def fleet_information(self) -> list[dict[str, Any]]:
+        """Return the latest details of every Sonic device."""
+        return list(self._fleet_information.values())
+
+    @property
+    def is_active(self) -> bool:
+        """Return True if water flows through, or a valve moves on, any device."""
+        return bool(self._active_devices) or any(
+            device.get("valve_state") in ACTIVE_VALVE_STATES
+            for device in self._fleet_information.values()
+        )
+
+    def device_information(self, device_id: str) -> dict[str, Any]:
+        """Return the latest details of a single Sonic device."""
+        return self._fleet_information.get(device_id, {})
+
+    @property
+    def signal_ids(self) -> list[str | None]:
+        """Return the ids of the Signal hubs the devices talk through."""
+        return list(self._signal_devices)
+
+    def signal_device_ids(self, signal_id: str | None) -> list[str]:
+        """Return the ids of the Sonic devices talking through a Signal hub."""
+        return self._signal_devices.get(signal_id, [])
+
+    @callback
+    def async_set_device_active(self, device_id: str, active: bool) -> None:
+        """Record the activity of a device, polling faster while any is active."""
+        if active:
+            self._active_devices.add(device_id)
+            self._async_poll_sooner(self._poll_interval.next_interval(True))
+        else:
+            self._active_devices.discard(device_id)
+
+    @callback
+    def async_set_device_information(self, details: dict[str, Any]) -> None:
+        """Replace the details of a single device fetched on its own."""
+        self._fleet_information[details["id"]] = details
+        self._async_index_signals()
+
+    @callback
+    def async_set_fleet_information(self, sonic_data: dict[str, Any]) -> None:
+        """Index a response of the all sonic details endpoint just fetched."""
+        self._async_index_fleet(sonic_data["data"])
+        self._async_section_updated("details")
+
+    @callback
+    def async_restore_fleet_information(
+        self, devices: list[dict[str, Any]], updated_at: dict[str, str]
+    ) -> None:
+        """Restore the device details cached by a previous run."""
+        self._async_index_fleet(devices)
+        self._async_restore_section_times(updated_at)
+
+    @callback
+    def _async_index_fleet(self, devices: list[dict[str, Any]]) -> None:
+        """Index the details of every device by device id."""
+        self._fleet_information = {device["id"]: device for device in devices}
+        self._async_index_signals()
+        LOGGER.debug("Indexed the details of %d Sonic devices", len(self._fleet_information))
+
+    @callback
+    def _async_index_signals(self) -> None:
+        """Group the devices by Signal hub and track the lost radio links.
+
+        The hub endpoints report no link state, so a hub counts as
+        disconnected when none of its Sonics has a radio link."""
+        signal_devices: dict[str | None, list[str]] = {}
+        disconnected_devices: set[str] = set()
+        for device_id, details in self._fleet_information.items():
+            signal_devices.setdefault(details.get("signal_id"), []).append(device_id)
+            if details.get("radio_connection") != "connected":
+                disconnected_devices.add(device_id)
+        disconnected_signals = {
+            signal_id
+            for signal_id, device_ids in signal_devices.items()
+            if disconnected_devices.issuperset(device_ids)
+        }
+        for signal_id in disconnected_signals - self.disconnected_signals:
+            LOGGER.info(
+                "Signal hub %s lost the radio link to its %d Sonic devices",
+                signal_id,
+                len(signal_devices[signal_id]),
+            )
+        for signal_id in self.disconnected_signals - disconnected_signals:
+            LOGGER.info("Signal hub %s is connected again", signal_id)
+        self._signal_devices = signal_devices
+        self.disconnected_signals = disconnected_signals
+
+
+class SonicDeviceDataUpdateCoordinator(SonicDataUpdateCoordinator):
+    """Sonic device object, the telemetry coordinator of a single device.
+
+    Regular listeners are notified of new telemetry, configuration listeners
+    of new device details from the fleet coordinator."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_client: Client,
+        scheduler: SonicRequestScheduler,
+        device_id: str,
+        fleet: SonicFleetDataUpdateCoordinator,
+        min_interval: timedelta,
+        max_interval: timedelta,
+        statistics_windows: Sequence[timedelta],
+    ) -> None:
         """Initialize the device."""
         self.hass: HomeAssistant = hass
         self.api_client: Client = api_client
+        self.scheduler: SonicRequestScheduler = scheduler
         self._sonic_device_id: str = device_id
-        self._device_information: dict[str, Any] = {}
+        self._fleet: SonicFleetDataUpdateCoordinator = fleet
+        self._device_information: dict[str, Any] = fleet.device_information(device_id)
         self._telemetry_information: dict[str, Any] = {}
+        self.configuration = SonicConfigurationSnapshot.from_details(
+            self._device_information
+        )
+        self.property: PropertyDataUpdateCoordinator | None = None
+        self._unsub_property: CALLBACK_TYPE | None = None
+        self.telemetry = SonicTelemetrySnapshot.from_telemetry({}, self.time_zone)
+        # Telemetry is never fetched more often than the shortest interval.
+        self.history = TelemetryHistory(
+            statistics_windows, int(max(statistics_windows) / min_interval) + 1
+        )
+        self.leak_detector = LeakDetector()
+        self._report_cadence = ReportCadence()
+        self._device_phase = self._phase = phase_offset(device_id)
+        self.valve_target: str | None = None
+        self._valve_follow_up: asyncio.Task[None] | None = None
+        self._configuration_listeners: list[
+            tuple[CALLBACK_TYPE, tuple[str, ...] | None]
+        ] = []
+        self._notified_configuration_available: bool | None = None
+        self._notified_breaker_open: bool = False
+        self._poll_interval = AdaptivePollInterval(
+            min_interval, max_interval, DEFAULT_UPDATE_INTERVAL
+        )
         super().__init__(
             hass,
             LOGGER,
             name=f"{SONIC_DOMAIN}-{device_id}",
-            update_interval=timedelta(seconds=120),
+            update_interval=self._poll_interval.interval,
         )
+        self._unsub_fleet = fleet.async_add_listener(self._handle_fleet_update)
 
     async def _async_update_data(self):
-        """Update data via library."""
+        """Update the device telemetry via library.
+
+        Device details are refreshed in bulk by the fleet coordinator. Without
+        a radio link the cloud only repeats the last report, so telemetry is
+        skipped until the fleet details show the device connected again."""
+        if not self.configuration.connected:
+            self._changed_fields = set()
+            self.update_interval = self._poll_interval.next_interval(False)
+            self._fleet.async_set_device_active(self._sonic_device_id, False)
+            return
         try:
-            async with timeout(10):
-                await asyncio.gather(
-                    *[
-                        self._update_device(),
-                    ]
-                )
-        except (RequestError) as error:
+            telemetry = await self._async_fetch(
+                self.api_client.sonic.async_sonic_telemetry_by_id,
+                self._sonic_device_id,
+            )
+        except API_ERRORS as error:
             raise UpdateFailed(error) from error
+        self._async_section_updated("telemetry")
+        if (probed_at := telemetry.get("probed_at")) is not None and (
+            not self._report_cadence.advance(probed_at)
+        ):
+            # The device has not reported since the last poll.
+            self._changed_fields = set()
+        else:
+            snapshot = SonicTelemetrySnapshot.from_telemetry(telemetry, self.time_zone)
+            self._changed_fields = changed_fields(self.telemetry, snapshot)
+            self._telemetry_information = telemetry
+            self.telemetry = snapshot
+            if snapshot.probed_at is not None and self.history.add(
+                probed_at,
+                {metric: getattr(snapshot, metric) for metric in HISTORY_METRICS},
+            ):
+                self._changed_fields.add("history")
+                if (water_flow := telemetry.get("water_flow")) is not None:
+                    # Unrounded, a trickle below the display precision is
+                    # still a continuous low flow.
+                    self._async_detect_leaks(probed_at, water_flow / 1000)
+        active = self.is_active
+        self.update_interval = self._poll_interval.next_interval(active)
+        self._phase = self._device_phase
+        if (
+            until_next_report := self._report_cadence.until_next_report(
+                dt_util.utcnow().timestamp()
+            )
+        ) is not None and until_next_report > self.update_interval:
+            # Polling before the next report is due would only fetch the
+            # same one again. The reports of the device set the phase then.
+            self.update_interval = until_next_report
+            self._phase = None
+        self._fleet.async_set_device_active(self._sonic_device_id, active)
+
+    @callback
+    def _async_detect_leaks(self, time: float, flow_rate: float) -> None:
+        """Feed a telemetry sample to the leak detector and fire an event for
+        every problem it raises."""
+        long_flow_delay = high_volume_threshold = None
+        if self.property is not None:
+            property_snapshot = self.property.snapshot
+            if property_snapshot.long_flow_notification_delay_mins is not None:
+                long_flow_delay = timedelta(
+                    minutes=property_snapshot.long_flow_notification_delay_mins
+                )
+            high_volume_threshold = property_snapshot.high_volume_threshold_litres
+        problems = self.leak_detector.problems
+        raised = self.leak_detector.add(
+            time, flow_rate, long_flow_delay, high_volume_threshold
+        )
+        if self.leak_detector.problems != problems:
+            self._changed_fields.add("leak")
+        for problem in raised:
+            LOGGER.warning("Sonic %s detected %s", self.device_name, problem)
+            self.hass.bus.async_fire(
+                EVENT_LEAK_DETECTED,
+                {
+                    "sonic_id": self._sonic_device_id,
+                    "name": self.device_name,
+                    "problem": problem,
+                    "flow_started_at": self.leak_detector.flow_started_at,
+                    "volume": round(self.leak_detector.volume, 1),
+                },
+            )
 
     @property
     def id(self) -> str:
         """Return Sonic device id."""
         return self._sonic_device_id
 
+    @property
+    def telemetry_information(self) -> dict[str, Any]:
+        """Return the latest telemetry payload."""
+        return self._telemetry_information
+
     @property
     def device_name(self) -> str:
         """Return device name."""
@@ -78,30 +431,45 @@ class SonicDeviceDataUpdateCoordinator(DataUpdateCoordinator):
     def last_heard_from_time(self) -> str:
         """Return Unix timestamp in seconds when the sonic took measurements
         Will need to do conversion from timestamp to datetime if HomeAssistant doesn't do it automatically"""
-        return self._telemetry_information["probed_at"]
+        return self._telemetry_information.get("probed_at")
 
     @property
     def available(self) -> bool:
         """Return True if device is available."""
+        return self.section_available("telemetry") and self.configuration_available
+
+    @property
+    def configuration_available(self) -> bool:
+        """Return True if the device configuration is available."""
+        return self._fleet.section_available("details") and self.configuration.connected
+
+    @property
+    def configuration_updated_at(self) -> datetime | None:
+        """Return the time the device details were last fetched."""
+        return self._fleet.section_updated_at.get("details")
+
+    @property
+    def is_active(self) -> bool:
+        """Return True if water is flowing or the valve is moving."""
         return (
-            self.last_update_success
-            and self._device_information["radio_connection"] == "connected"
+            bool(self._telemetry_information.get("water_flow"))
+            or self._device_information.get("valve_state") in ACTIVE_VALVE_STATES
         )
 
     @property
     def current_flow_rate(self) -> float:
         """Return current flow rate in ml/min."""
-        return self._telemetry_information["water_flow"]
+        return self._telemetry_information.get("water_flow")
 
     @property
     def current_mbar(self) -> int:
         """Return the current pressure in mbar."""
-        return self._telemetry_information["pressure"]
+        return self._telemetry_information.get("pressure")
 
     @property
     def temperature(self) -> float:
         """Return the current temperature in degrees C."""
-        return self._telemetry_information["water_temp"]
+        return self._telemetry_information.get("water_temp")
 
     @property
     def battery_state(self) -> str:
@@ -126,10 +494,10 @@ class SonicDeviceDataUpdateCoordinator(DataUpdateCoordinator):
         return self._device_information["auto_shut_off_volume_limit"]
 
     @property
-    def signal_id(self) -> str:
+    def signal_id(self) -> str | None:
         """Return the associated signal device id
         A Signal device (sometimes called hub) communicates with WiFi and the Sonic device"""
-        return self._device_information["signal_id"]
+        return self._device_information.get("signal_id")
 
     @property
     def sonic_status(self) -> str:
@@ -142,15 +510,175 @@ class SonicDeviceDataUpdateCoordinator(DataUpdateCoordinator):
         Options are: 'open, closed, opening, closing, faulty, pressure_test, requested_open, requested_closed'"""
         return self._device_information["valve_state"]
 
-    async def _update_device(self, *_) -> None:
-        """Update the device information from the API."""
-        self._device_information = await self.api_client.sonic.async_get_sonic_details(
-            self._sonic_device_id
+    async def async_open_valve(self) -> None:
+        """Open the valve, ahead of any queued polling."""
+        await self._async_command_valve(
+            self.api_client.sonic.async_open_sonic_valve, "open"
         )
-        self._telemetry_information = (
-            await self.api_client.sonic.async_sonic_telemetry_by_id(
-                self._sonic_device_id
-            )
+
+    async def async_close_valve(self) -> None:
+        """Close the valve, ahead of any queued polling."""
+        await self._async_command_valve(
+            self.api_client.sonic.async_close_sonic_valve, "closed"
         )
-        LOGGER.debug("Sonic device data: %s", self._device_information)
-        LOGGER.debug("Sonic telemetry data: %s", self._telemetry_information)
+
+    async def _async_command_valve(
+        self, command: Callable[[str], Awaitable[None]], target: str
+    ) -> None:
+        """Send a valve command and follow the valve until it gets there."""
+        await self.scheduler.async_request(
+            RequestPriority.VALVE,
+            command,
+            self._sonic_device_id,
+            instrumentation=self.request_statistics,
+        )
+        if self._valve_follow_up is not None:
+            self._valve_follow_up.cancel()
+        self.valve_target = target
+        self._async_notify_configuration_listeners({"valve_target"})
+        self._valve_follow_up = self.hass.async_create_background_task(
+            self._async_follow_valve(target),
+            f"{self.name} valve follow up",
+        )
+
+    async def async_wait_for_valve(self) -> None:
+        """Wait until the valve followed after the last command settles or
+        the follow up gives up."""
+        if (follow_up := self._valve_follow_up) is not None:
+            # Waited rather than awaited, a newer command cancels the follow up.
+            await asyncio.wait({follow_up})
+
+    async def _async_follow_valve(self, target: str) -> None:
+        """Poll the device details a few times, fast, until the valve reaches
+        the target state or reports a fault."""
+        try:
+            for delay in VALVE_FOLLOW_UP_DELAYS:
+                await asyncio.sleep(delay.total_seconds())
+                try:
+                    details = await self.scheduler.async_request(
+                        RequestPriority.VALVE,
+                        self.api_client.sonic.async_get_sonic_details,
+                        self._sonic_device_id,
+                        instrumentation=self.request_statistics,
+                    )
+                except API_ERRORS as err:
+                    LOGGER.debug("Unable to follow the valve of %s: %s", self.name, err)
+                    continue
+                self._fleet.async_set_device_information(details)
+                self._handle_fleet_update()
+                if self.configuration.valve_state in (target, "faulty"):
+                    return
+            LOGGER.debug("The valve of %s did not settle while followed", self.name)
+        finally:
+            if self._valve_follow_up is asyncio.current_task():
+                self._valve_follow_up = None
+                self.valve_target = None
+                self._async_notify_configuration_listeners({"valve_target"})
+
+    @property
+    def property_id(self) -> str | None:
+        """Return the id of the property the device is installed at."""
+        return self._device_information.get("property_id")
+
+    @property
+    def time_zone(self) -> tzinfo:
+        """Return the time zone of the property, or the Home Assistant one."""
+        if self.property is None:
+            return dt_util.DEFAULT_TIME_ZONE
+        return self.property.time_zone
+
+    @callback
+    def async_set_property(self, property: PropertyDataUpdateCoordinator) -> None:
+        """Associate the device with the property it is installed at."""
+        self.property = property
+        self._unsub_property = property.async_add_listener(
+            self._handle_property_update, ("timezone",)
+        )
+        self._handle_property_update()
+
+    @callback
+    def _handle_property_update(self) -> None:
+        """Convert the telemetry timestamp when the property time zone changes.
+
+        The instant itself is unchanged, so entities are not written."""
+        self.telemetry = SonicTelemetrySnapshot.from_telemetry(
+            self._telemetry_information, self.time_zone
+        )
+
+    async def async_shutdown(self) -> None:
+        """Stop listening to the fleet and cancel any scheduled call."""
+        self._unsub_fleet()
+        if self._valve_follow_up is not None:
+            self._valve_follow_up.cancel()
+        if self._unsub_property is not None:
+            self._unsub_property()
+        await super().async_shutdown()
+
+    @callback
+    def async_restore_telemetry(
+        self, telemetry: dict[str, Any], updated_at: dict[str, str]
+    ) -> None:
+        """Restore telemetry cached by a previous run."""
+        self._telemetry_information = telemetry
+        self.telemetry = SonicTelemetrySnapshot.from_telemetry(
+            telemetry, self.time_zone
+        )
+        if (probed_at := telemetry.get("probed_at")) is not None:
+            self._report_cadence.advance(probed_at)
+        self._async_restore_section_times(updated_at)
+
+    @callback
+    def async_add_configuration_listener(
+        self, update_callback: CALLBACK_TYPE, context: tuple[str, ...] | None = None
+    ) -> Callable[[], None]:
+        """Listen for updates to the device configuration.
+
+        The context lists the detail fields the listener reads, see
+        SonicDataUpdateCoordinator."""
+        listener = (update_callback, context)
+        self._configuration_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove configuration listener."""
+            self._configuration_listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def _handle_fleet_update(self) -> None:
+        """Pick this device out of the latest fleet details and notify entities
+        whose fields changed."""
+        self._device_information = self._fleet.device_information(self._sonic_device_id)
+        snapshot = SonicConfigurationSnapshot.from_details(self._device_information)
+        changed: set[str] | None = changed_fields(self.configuration, snapshot)
+        reconnected = snapshot.connected and not self.configuration.connected
+        self.configuration = snapshot
+        if self.is_active:
+            self._async_poll_sooner(self._poll_interval.next_interval(True))
+        if reconnected and self._listeners:
+            # Catch up with the telemetry missed while the link was down.
+            self.hass.async_create_task(self.async_request_refresh())
+        if self.configuration_available != self._notified_configuration_available:
+            # Availability of every entity of the device depends on it.
+            self._notified_configuration_available = self.configuration_available
+            changed = None
+            # Not async_update_listeners, that would close the telemetry
+            # update cycle and drop the fields changed by it.
+            self._async_notify_listeners(None)
+        breaker_open = self.scheduler.breaker.is_open
+        if not self._fleet.last_update_success or (
+            breaker_open != self._notified_breaker_open
+        ):
+            # The details age and their staleness attributes come and go
+            # without any field changing.
+            self._notified_breaker_open = breaker_open
+            changed = None
+        self._async_notify_configuration_listeners(changed)
+
+    @callback
+    def _async_notify_configuration_listeners(self, changed: set[str] | None) -> None:
+        """Call the configuration listeners reading any of the changed fields."""
+        for update_callback, context in list(self._configuration_listeners):
+            if changed is None or context is None or not changed.isdisjoint(context):
+                update_callback()
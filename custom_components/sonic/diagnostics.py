@@ -0,0 +1,122 @@
+"""Diagnostics support for the Sonic integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_bytes
+
+from .const import CONF_TOKEN, CONF_USER_ID, DOMAIN
+from .coordinator import SonicDataUpdateCoordinator, UpdateCycleTrace
+
+TO_REDACT = {
+    CONF_PASSWORD,
+    CONF_TOKEN,
+    CONF_USER_ID,
+    CONF_USERNAME,
+    "address",
+    "email",
+    "lat",
+    "lng",
+    "postcode",
+    "serial_no",
+    "uprn",
+    "webhook_url",
+}
+
+
+def _cycle_diagnostics(cycle: UpdateCycleTrace) -> dict[str, Any]:
+    """Return the trace of an update cycle with redacted payloads."""
+    return {
+        "started_at": cycle.started_at.isoformat(),
+        "duration_ms": None if cycle.duration is None else round(cycle.duration * 1000),
+        "success": cycle.success,
+        "error": cycle.error,
+        "changed_fields": (
+            None if cycle.changed_fields is None else sorted(cycle.changed_fields)
+        ),
+        "requests": [
+            {
+                "endpoint": request.endpoint,
+                "duration_ms": round(request.duration * 1000),
+                "latency_ms": (
+                    None if request.latency is None else round(request.latency * 1000)
+                ),
+                "outcome": request.outcome,
+                "payload_bytes": (
+                    None if request.payload is None else len(json_bytes(request.payload))
+                ),
+                "payload": (
+                    async_redact_data(request.payload, TO_REDACT)
+                    if isinstance(request.payload, (dict, list))
+                    else request.payload
+                ),
+            }
+            for request in cycle.requests
+        ],
+    }
+
+
+def _coordinator_diagnostics(coordinator: SonicDataUpdateCoordinator) -> dict[str, Any]:
+    """Return the state, request statistics and recent cycles of a coordinator."""
+    return {
+        "name": coordinator.name,
+        "last_update_success": coordinator.last_update_success,
+        "sections_updated_at": {
+            section: updated_at.isoformat()
+            for section, updated_at in coordinator.section_updated_at.items()
+        },
+        "update_interval": (
+            None
+            if coordinator.update_interval is None
+            else coordinator.update_interval.total_seconds()
+        ),
+        "requests": coordinator.request_statistics.as_dict(),
+        "cycles": [_cycle_diagnostics(cycle) for cycle in coordinator.trace],
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    scheduler = entry_data["scheduler"]
+    fleet = entry_data["fleet"]
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "scheduler": {
+            "queued": scheduler.queued,
+            "throttled": scheduler.throttled,
+            "breaker": {
+                "state": scheduler.breaker.state,
+                "failures": scheduler.breaker.failures,
+                "opened_at": (
+                    None
+                    if scheduler.breaker.opened_at is None
+                    else scheduler.breaker.opened_at.isoformat()
+                ),
+            },
+            "requests": scheduler.instrumentation.as_dict(),
+        },
+        "fleet": _coordinator_diagnostics(fleet),
+        "signals": {
+            signal_id: {
+                "devices": len(fleet.signal_device_ids(signal_id)),
+                "connected": signal_id not in fleet.disconnected_signals,
+            }
+            for signal_id in fleet.signal_ids
+        },
+        "devices": [
+            _coordinator_diagnostics(device) for device in entry_data["devices"]
+        ],
+        "properties": [
+            _coordinator_diagnostics(property) for property in entry_data["properties"]
+        ],
+    }
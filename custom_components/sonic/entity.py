@@ -1,19 +1,43 @@
 """Base entity class for Sonic & Property entities."""
 from __future__ import annotations
 
+from datetime import datetime, timedelta
 from typing import Any
 
-from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo, Entity, EntityCategory
 
 from .const import DOMAIN as SONIC_DOMAIN
 from .device import SonicDeviceDataUpdateCoordinator
 from .property import PropertyDataUpdateCoordinator
 
+# Attributes of the entities showing their last known state while the cloud
+# is unreachable.
+ATTR_STALE = "stale"
+ATTR_FETCHED_AT = "fetched_at"
+
+def _stale_attributes(fetched_at: datetime | None) -> dict[str, Any]:
+    """Return the attributes marking a state as last known rather than current."""
+    return {
+        ATTR_STALE: True,
+        ATTR_FETCHED_AT: None if fetched_at is None else fetched_at.isoformat(),
+    }
+
+
 class SonicEntity(Entity):
     """A base class for Sonic entities."""
 
     _attr_force_update = False
     _attr_should_poll = False
+    # Entities reading the device configuration rather than its telemetry
+    # are updated by the slower fleet coordinator.
+    _configuration_entity = False
+    # Snapshot fields the state is built from, the entity is only written
+    # when one of them changes. Empty means on every update.
+    _source_fields: tuple[str, ...] = ()
+    # Age after which the telemetry is too old for the entity, None for the
+    # default of the coordinator. Configuration entities follow the fleet.
+    _stale_after: timedelta | None = None
 
     def __init__(
         self,
@@ -42,7 +66,28 @@ class SonicEntity(Entity):
     @property
     def available(self) -> bool:
         """Return True if device is available."""
-        return self._device.available
+        if self._configuration_entity:
+            return self._device.configuration_available
+        return (
+            self._device.section_available("telemetry", self._stale_after)
+            and self._device.configuration_available
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the staleness of the state while the cloud is unreachable."""
+        return self._stale_attributes or None
+
+    @property
+    def _stale_attributes(self) -> dict[str, Any]:
+        """Return the staleness attributes, empty while the cloud is reachable."""
+        if not self._device.scheduler.breaker.is_open:
+            return {}
+        if self._configuration_entity:
+            fetched_at = self._device.configuration_updated_at
+        else:
+            fetched_at = self._device.section_updated_at.get("telemetry")
+        return _stale_attributes(fetched_at)
 
     async def async_update(self):
         """Update Sonic entity."""
@@ -50,7 +95,18 @@ class SonicEntity(Entity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_write_ha_state))
+        if self._configuration_entity:
+            self.async_on_remove(
+                self._device.async_add_configuration_listener(
+                    self.async_write_ha_state, self._source_fields or None
+                )
+            )
+        else:
+            self.async_on_remove(
+                self._device.async_add_listener(
+                    self.async_write_ha_state, self._source_fields or None
+                )
+            )
 
 
 class PropertyEntity(Entity):
@@ -58,6 +114,12 @@ class PropertyEntity(Entity):
 
     _attr_force_update = False
     _attr_should_poll = False
+    # Snapshot fields the state is built from, the entity is only written
+    # when one of them changes. Empty means on every update.
+    _source_fields: tuple[str, ...] = ()
+    # Age after which the sections read are too old for the entity, None
+    # for the default of the coordinator.
+    _stale_after: timedelta | None = None
 
     def __init__(
         self,
@@ -85,13 +147,63 @@ class PropertyEntity(Entity):
 
     @property
     def available(self) -> bool:
-        """Return True if property is available."""
-        return self._device.id != None
+        """Return True if the property sections read are fresh enough."""
+        return all(
+            self._device.section_available(section, self._stale_after)
+            for section in self._device.field_sections(self._source_fields)
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the staleness of the state while the cloud is unreachable."""
+        return self._stale_attributes or None
+
+    @property
+    def _stale_attributes(self) -> dict[str, Any]:
+        """Return the staleness attributes, empty while the cloud is reachable."""
+        if not self._device.scheduler.breaker.is_open:
+            return {}
+        fetched_at = [
+            self._device.section_updated_at[section]
+            for section in self._device.field_sections(self._source_fields)
+            if section in self._device.section_updated_at
+        ]
+        return _stale_attributes(min(fetched_at, default=None))
 
     async def async_update(self):
         """Update Property entity."""
-        await self._property.async_request_refresh()
+        await self._device.async_request_refresh()
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_write_ha_state))
+        self.async_on_remove(
+            self._device.async_add_listener(
+                self.async_write_ha_state, self._source_fields or None
+            )
+        )
+
+
+class SonicAccountEntity(Entity):
+    """A base class for entities of the Hero Labs account.
+
+    Their state is kept in memory by the integration, so they are polled to
+    publish it periodically rather than on every request."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = True
+
+    def __init__(self, entry_id: str, entity_type: str, name: str) -> None:
+        """Init account entity."""
+        self._attr_name = name
+        self._attr_unique_id = f"{entry_id}_{entity_type}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(SONIC_DOMAIN, entry_id)},
+            manufacturer="Hero Labs",
+            model="Account",
+            name="Hero Labs Account",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    async def async_added_to_hass(self):
+        """Publish the current state straight away rather than after a poll."""
+        await self.async_update()
@@ -0,0 +1,157 @@
+"""In-memory telemetry history of a Sonic device with rolling statistics."""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import timedelta
+import math
+
+# Telemetry metrics kept in the history, named after the snapshot fields.
+HISTORY_METRICS = ("flow_rate", "pressure", "temperature")
+
+# Upper bound of samples kept per device, a day of telemetry at 10 seconds.
+MAX_HISTORY_SAMPLES = 8640
+
+
+@dataclass(frozen=True, slots=True)
+class RollingStatistics:
+    """Statistics of one metric over one window."""
+
+    minimum: float
+    maximum: float
+    mean: float
+    stddev: float
+    samples: int
+
+
+class _RollingMetric:
+    """Running sums and monotonic queues of one metric within one window."""
+
+    __slots__ = ("total", "total_squares", "minima", "maxima")
+
+    def __init__(self) -> None:
+        """Initialize an empty metric."""
+        self.total: float = 0.0
+        self.total_squares: float = 0.0
+        # (sequence, value) pairs, increasing for minima and decreasing for
+        # maxima, so the extreme of the window is always at the front.
+        self.minima: deque[tuple[int, float]] = deque()
+        self.maxima: deque[tuple[int, float]] = deque()
+
+    def push(self, sequence: int, value: float) -> None:
+        """Add the newest sample of the window."""
+        self.total += value
+        self.total_squares += value * value
+        while self.minima and self.minima[-1][1] >= value:
+            self.minima.pop()
+        self.minima.append((sequence, value))
+        while self.maxima and self.maxima[-1][1] <= value:
+            self.maxima.pop()
+        self.maxima.append((sequence, value))
+
+    def pop(self, sequence: int, value: float) -> None:
+        """Remove the oldest sample of the window."""
+        self.total -= value
+        self.total_squares -= value * value
+        if self.minima[0][0] == sequence:
+            self.minima.popleft()
+        if self.maxima[0][0] == sequence:
+            self.maxima.popleft()
+
+
+class _RollingWindow:
+    """Sequence of the oldest sample in a window and its metrics."""
+
+    __slots__ = ("length", "first", "metrics")
+
+    def __init__(self, length: timedelta, first: int) -> None:
+        """Initialize an empty window."""
+        self.length: float = length.total_seconds()
+        self.first: int = first
+        self.metrics: dict[str, _RollingMetric] = {
+            metric: _RollingMetric() for metric in HISTORY_METRICS
+        }
+
+
+class TelemetryHistory:
+    """Ring buffer of recent telemetry with rolling statistics per window.
+
+    Samples are stored once in arrays shared by every window, each window
+    only tracks where it starts along with running sums and monotonic
+    queues, so adding a sample and reading statistics are constant time
+    (amortized for the minimum and maximum). Expired samples leave a window
+    when the next sample arrives."""
+
+    def __init__(self, windows: Iterable[timedelta], capacity: int) -> None:
+        """Initialize an empty history holding up to capacity samples."""
+        self._capacity: int = max(1, min(capacity, MAX_HISTORY_SAMPLES))
+        # The arrays grow to the capacity and are then reused as a ring.
+        self._times = array("d")
+        self._values: dict[str, array[float]] = {
+            metric: array("d") for metric in HISTORY_METRICS
+        }
+        self._next: int = 0
+        self._windows: dict[timedelta, _RollingWindow] = {
+            window: _RollingWindow(window, 0) for window in windows
+        }
+
+    @property
+    def windows(self) -> list[timedelta]:
+        """Return the windows statistics are kept for."""
+        return list(self._windows)
+
+    def add(self, time: float, values: Mapping[str, float | None]) -> bool:
+        """Add a sample taken at a POSIX time, returning True when kept.
+
+        Samples not newer than the latest one or missing a metric are ignored."""
+        if self._next and time <= self._times[(self._next - 1) % self._capacity]:
+            return False
+        if any(values.get(metric) is None for metric in HISTORY_METRICS):
+            return False
+        sequence = self._next
+        slot = sequence % self._capacity
+        for window in self._windows.values():
+            if window.first <= sequence - self._capacity:
+                # The ring is about to overwrite the oldest sample of the window.
+                self._evict(window)
+        if slot == len(self._times):
+            self._times.append(time)
+            for metric in HISTORY_METRICS:
+                self._values[metric].append(values[metric])
+        else:
+            self._times[slot] = time
+            for metric in HISTORY_METRICS:
+                self._values[metric][slot] = values[metric]
+        self._next += 1
+        for window in self._windows.values():
+            for metric, rolling in window.metrics.items():
+                rolling.push(sequence, values[metric])
+            while time - self._times[window.first % self._capacity] > window.length:
+                self._evict(window)
+        return True
+
+    def _evict(self, window: _RollingWindow) -> None:
+        """Remove the oldest sample from a window."""
+        slot = window.first % self._capacity
+        for metric, rolling in window.metrics.items():
+            rolling.pop(window.first, self._values[metric][slot])
+        window.first += 1
+
+    def statistics(self, window: timedelta, metric: str) -> RollingStatistics | None:
+        """Return the statistics of a metric over a window, None when empty."""
+        rolling_window = self._windows[window]
+        samples = self._next - rolling_window.first
+        if samples <= 0:
+            return None
+        rolling = rolling_window.metrics[metric]
+        mean = rolling.total / samples
+        variance = max(0.0, rolling.total_squares / samples - mean * mean)
+        return RollingStatistics(
+            minimum=rolling.minima[0][1],
+            maximum=rolling.maxima[0][1],
+            mean=mean,
+            stddev=math.sqrt(variance),
+            samples=samples,
+        )
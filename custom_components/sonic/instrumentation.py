@@ -0,0 +1,128 @@
+"""Latency and error instrumentation of the Hero Labs API requests."""
+from __future__ import annotations
+
+from enum import StrEnum
+from typing import Any
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket
+# holds everything slower up to the request timeout.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Weight of the latest request in the moving average latency.
+LATENCY_SMOOTHING = 0.2
+
+
+class RequestOutcome(StrEnum):
+    """How a request to the Hero Labs API ended."""
+
+    SUCCESS = "success"
+    ERROR = "error"
+    THROTTLED = "throttled"
+    TIMEOUT = "timeout"
+
+
+class EndpointStatistics:
+    """Request counters and latency histogram of one API endpoint."""
+
+    __slots__ = (
+        "requests",
+        "errors",
+        "throttles",
+        "timeouts",
+        "buckets",
+        "latency_average",
+        "latency_last",
+        "latency_max",
+    )
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.requests: int = 0
+        self.errors: int = 0
+        self.throttles: int = 0
+        self.timeouts: int = 0
+        self.buckets: list[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_average: float | None = None
+        self.latency_last: float | None = None
+        self.latency_max: float = 0.0
+
+    def record(self, latency: float, outcome: RequestOutcome) -> None:
+        """Record a request that took latency seconds."""
+        self.requests += 1
+        if outcome is RequestOutcome.ERROR:
+            self.errors += 1
+        elif outcome is RequestOutcome.THROTTLED:
+            self.throttles += 1
+        elif outcome is RequestOutcome.TIMEOUT:
+            self.timeouts += 1
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and latency > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        self.buckets[bucket] += 1
+        self.latency_last = latency
+        self.latency_max = max(self.latency_max, latency)
+        if self.latency_average is None:
+            self.latency_average = latency
+        else:
+            self.latency_average += LATENCY_SMOOTHING * (latency - self.latency_average)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the bucket bound below which a fraction of latencies fall."""
+        if not self.requests:
+            return None
+        rank = fraction * self.requests
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.latency_max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as plain values, latencies in milliseconds."""
+
+        def milliseconds(value: float | None) -> float | None:
+            return None if value is None else round(value * 1000)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttles": self.throttles,
+            "timeouts": self.timeouts,
+            "latency_average_ms": milliseconds(self.latency_average),
+            "latency_last_ms": milliseconds(self.latency_last),
+            "latency_max_ms": milliseconds(self.latency_max),
+            "latency_p50_ms": milliseconds(self.percentile(0.5)),
+            "latency_p95_ms": milliseconds(self.percentile(0.95)),
+            "latency_histogram": {
+                **{
+                    f"le_{round(bound * 1000)}_ms": count
+                    for bound, count in zip(LATENCY_BUCKETS, self.buckets)
+                },
+                "slower": self.buckets[-1],
+            },
+        }
+
+
+class RequestInstrumentation:
+    """Statistics of every API endpoint called by an account or coordinator."""
+
+    def __init__(self) -> None:
+        """Initialize without any request."""
+        self.endpoints: dict[str, EndpointStatistics] = {}
+
+    def record(self, endpoint: str, latency: float, outcome: RequestOutcome) -> None:
+        """Record a request to an endpoint."""
+        if (statistics := self.endpoints.get(endpoint)) is None:
+            statistics = self.endpoints[endpoint] = EndpointStatistics()
+        statistics.record(latency, outcome)
+
+    def get(self, endpoint: str) -> EndpointStatistics | None:
+        """Return the statistics of an endpoint, None before its first request."""
+        return self.endpoints.get(endpoint)
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the statistics of every endpoint as plain values."""
+        return {
+            endpoint: statistics.as_dict()
+            for endpoint, statistics in self.endpoints.items()
+        }
@@ -0,0 +1,106 @@
+"""Local leak detection over the telemetry stream of a Sonic device."""
+from __future__ import annotations
+
+from datetime import timedelta
+from enum import StrEnum
+
+# Flow below this rate in litres per minute that never stops is a drip or a
+# running cistern rather than normal use.
+LOW_FLOW_RATE = 2.0
+LOW_FLOW_DURATION = timedelta(hours=1)
+
+# Samples further apart than this are not treated as one continuous flow.
+MAX_SAMPLE_GAP = timedelta(hours=1)
+
+
+class LeakProblem(StrEnum):
+    """Problems raised by the leak detector."""
+
+    CONTINUOUS_LOW_FLOW = "continuous_low_flow"
+    LONG_FLOW = "long_flow"
+    HIGH_VOLUME = "high_volume"
+
+
+class LeakDetector:
+    """Detect leaks from consecutive flow rate samples.
+
+    Only the current flow episode is tracked, its start, the start of the
+    low flow within it and the volume integrated so far, so memory and the
+    cost of a sample are constant however long the water runs."""
+
+    __slots__ = (
+        "_last_time",
+        "_last_flow_rate",
+        "_low_flow_started_at",
+        "flow_started_at",
+        "volume",
+        "problems",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the detector without any flow."""
+        self._last_time: float | None = None
+        self._last_flow_rate: float = 0.0
+        self._low_flow_started_at: float | None = None
+        self.flow_started_at: float | None = None
+        """POSIX time the current flow started, None without flow."""
+        self.volume: float = 0.0
+        """Litres used since the current flow started."""
+        self.problems: frozenset[LeakProblem] = frozenset()
+
+    def add(
+        self,
+        time: float,
+        flow_rate: float,
+        long_flow_delay: timedelta | None,
+        high_volume_threshold: float | None,
+    ) -> frozenset[LeakProblem]:
+        """Add a flow rate sample in litres per minute taken at a POSIX time.
+
+        The property thresholds are passed with every sample so changes to
+        them apply straight away, None disables the matching check. Returns
+        the problems raised by this sample."""
+        if self._last_time is not None and time <= self._last_time:
+            return frozenset()
+        if (
+            self._last_time is None
+            or time - self._last_time > MAX_SAMPLE_GAP.total_seconds()
+        ):
+            self.flow_started_at = None
+            self._low_flow_started_at = None
+        elif self.flow_started_at is not None:
+            self.volume += (
+                (self._last_flow_rate + flow_rate) / 2 * (time - self._last_time) / 60
+            )
+        self._last_time = time
+        self._last_flow_rate = flow_rate
+
+        if flow_rate <= 0:
+            self.flow_started_at = None
+            self._low_flow_started_at = None
+        else:
+            if self.flow_started_at is None:
+                self.flow_started_at = time
+                self.volume = 0.0
+            if flow_rate >= LOW_FLOW_RATE:
+                self._low_flow_started_at = None
+            elif self._low_flow_started_at is None:
+                self._low_flow_started_at = time
+
+        problems: set[LeakProblem] = set()
+        if (
+            self._low_flow_started_at is not None
+            and time - self._low_flow_started_at >= LOW_FLOW_DURATION.total_seconds()
+        ):
+            problems.add(LeakProblem.CONTINUOUS_LOW_FLOW)
+        if self.flow_started_at is not None:
+            if (
+                long_flow_delay is not None
+                and time - self.flow_started_at >= long_flow_delay.total_seconds()
+            ):
+                problems.add(LeakProblem.LONG_FLOW)
+            if high_volume_threshold is not None and self.volume >= high_volume_threshold:
+                problems.add(LeakProblem.HIGH_VOLUME)
+        raised = frozenset(problems) - self.problems
+        self.problems = frozenset(problems)
+        return raised
@@ -0,0 +1,149 @@
+"""Polling interval helpers for the Sonic coordinators."""
+from __future__ import annotations
+
+from datetime import timedelta
+import hashlib
+import random
+
+# Valve states during which the valve is moving or under test.
+ACTIVE_VALVE_STATES = frozenset(
+    {"opening", "closing", "pressure_test", "requested_open", "requested_closed"}
+)
+
+# Pauses between the device details requests following a valve command,
+# about a minute in total, the time the cloud gives the valve to act.
+VALVE_FOLLOW_UP_DELAYS = tuple(
+    timedelta(seconds=seconds) for seconds in (2, 3, 5, 10, 15, 25)
+)
+
+# Bounds of the delay before retrying a failed update. Coordinators raise
+# the minimum to their own update interval, so an outage never makes them
+# poll faster than they do while healthy.
+RETRY_DELAY_MIN = timedelta(seconds=15)
+RETRY_DELAY_MAX = timedelta(minutes=15)
+
+# Reports further apart than this are never taken as the reporting cadence.
+MAX_REPORT_CADENCE = timedelta(minutes=30)
+# Weight of the latest gap between reports in the moving average cadence.
+REPORT_CADENCE_SMOOTHING = 0.2
+# Time allowed for a report to reach the cloud after it was probed.
+REPORT_MARGIN = timedelta(seconds=5)
+
+
+class AdaptivePollInterval:
+    """Choose the next poll interval from the activity seen in the last poll.
+
+    Active devices are polled at the floor. Once activity stops the interval
+    doubles on every idle poll until it reaches the ceiling."""
+
+    def __init__(self, floor: timedelta, ceiling: timedelta, initial: timedelta) -> None:
+        """Initialize the interval controller."""
+        self._floor: timedelta = floor
+        self._ceiling: timedelta = max(floor, ceiling)
+        self._interval: timedelta = min(max(initial, self._floor), self._ceiling)
+
+    @property
+    def floor(self) -> timedelta:
+        """Return the shortest interval used while active."""
+        return self._floor
+
+    @property
+    def interval(self) -> timedelta:
+        """Return the current interval."""
+        return self._interval
+
+    def next_interval(self, active: bool) -> timedelta:
+        """Return the interval to wait before the next poll."""
+        if active:
+            self._interval = self._floor
+        else:
+            self._interval = min(self._interval * 2, self._ceiling)
+        return self._interval
+
+
+class ReportCadence:
+    """Track the probed_at watermark of a device and learn how often it
+    reports, so polls land just after the next report is due."""
+
+    def __init__(self) -> None:
+        """Initialize without any report."""
+        self.watermark: float | None = None
+        """POSIX time of the latest report seen."""
+        self.cadence: float | None = None
+        """Moving average of the seconds between reports."""
+
+    def advance(self, probed_at: float) -> bool:
+        """Record the probed_at of a telemetry payload.
+
+        Returns False when the device has not reported since the last call."""
+        if self.watermark is not None and probed_at <= self.watermark:
+            return False
+        if self.watermark is not None:
+            gap = probed_at - self.watermark
+            # Gaps after an outage or a long idle poll are not the cadence.
+            if gap <= MAX_REPORT_CADENCE.total_seconds():
+                if self.cadence is None or gap < self.cadence:
+                    # Polls only ever see reports late, take the shortest
+                    # gap straight away and let longer ones pull slowly.
+                    self.cadence = gap
+                else:
+                    self.cadence += REPORT_CADENCE_SMOOTHING * (gap - self.cadence)
+        self.watermark = probed_at
+        return True
+
+    def until_next_report(self, now: float) -> timedelta | None:
+        """Return the time left until the next report should be available,
+        None when the cadence is not known yet or the report is overdue."""
+        if self.watermark is None or self.cadence is None:
+            return None
+        delay = self.watermark + self.cadence + REPORT_MARGIN.total_seconds() - now
+        if delay <= 0:
+            return None
+        return timedelta(seconds=delay)
+
+
+def phase_offset(key: str) -> float:
+    """Return a fraction in [0, 1) derived from a key, the same on every run,
+    to spread the polls of many coordinators over their interval."""
+    digest = hashlib.sha256(key.encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+def next_phase_time(now: float, interval: float, phase: float) -> float:
+    """Return the time of the poll on a phase nearest to one interval from now.
+
+    Polls land on a grid of the interval shifted by the phase, so they are
+    between half and one and a half intervals apart while the interval is
+    being changed and exactly one interval apart otherwise."""
+    offset = phase * interval
+    return round((now + interval - offset) / interval) * interval + offset
+
+
+class DecorrelatedBackoff:
+    """Retry delays growing with decorrelated jitter.
+
+    Every delay is drawn between the minimum and three times the previous
+    delay, capped, so the retries of coordinators failing together spread
+    out instead of hitting the cloud in waves. A minimum above the maximum
+    is kept as a fixed delay."""
+
+    def __init__(
+        self,
+        minimum: timedelta = RETRY_DELAY_MIN,
+        maximum: timedelta = RETRY_DELAY_MAX,
+    ) -> None:
+        """Initialize the backoff."""
+        self._minimum: float = minimum.total_seconds()
+        self._maximum: float = max(maximum.total_seconds(), self._minimum)
+        self._delay: float = self._minimum
+
+    def next_delay(self) -> float:
+        """Return the seconds to wait before the next retry."""
+        self._delay = min(
+            self._maximum, random.uniform(self._minimum, self._delay * 3)
+        )
+        return self._delay
+
+    def reset(self) -> None:
+        """Start again from the minimum after a success."""
+        self._delay = self._minimum
@@ -2,155 +2,469 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import timedelta
+from dataclasses import dataclass
+from datetime import timedelta, tzinfo
 from typing import Any
 
-from async_timeout import timeout
 from herolabsapi.client import Client
-from herolabsapi.errors import RequestError
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN as SONIC_DOMAIN, LOGGER
+from .coordinator import API_ERRORS, SonicDataUpdateCoordinator, changed_fields
+from .polling import phase_offset
+from .scheduler import RequestPriority, SonicRequestScheduler
 
+# Snapshot fields read from each property endpoint, in request order.
+PROPERTY_SECTIONS = {
+    "information": frozenset({"name", "active"}),
+    "settings": frozenset(
+        {"auto_shut_off", "pressure_tests_enabled", "pressure_tests_schedule", "timezone"}
+    ),
+    "notification_settings": frozenset(
+        {
+            "cloud_disconnection",
+            "device_handle_moved",
+            "health_check_failed",
+            "high_volume_threshold_litres",
+            "long_flow_notification_delay_mins",
+            "low_battery_level",
+            "pressure_test_failed",
+            "pressure_test_skipped",
+            "radio_disconnection",
+            "legionella_risk",
+            "low_water_temperature",
+        }
+    ),
+}
 
-class PropertyDataUpdateCoordinator(DataUpdateCoordinator):
+# Setting changes made within this delay of each other are sent together.
+WRITE_COALESCE_DELAY = timedelta(milliseconds=500)
+
+
+@dataclass(frozen=True, slots=True)
+class PropertySnapshot:
+    """Information and settings of a property, built once per update."""
+
+    name: str | None
+    active: bool | None
+    auto_shut_off: bool | None
+    pressure_tests_enabled: bool | None
+    pressure_tests_schedule: str | None
+    timezone: str | None
+    cloud_disconnection: bool | None
+    device_handle_moved: bool | None
+    health_check_failed: bool | None
+    high_volume_threshold_litres: int | None
+    long_flow_notification_delay_mins: int | None
+    low_battery_level: bool | None
+    pressure_test_failed: bool | None
+    pressure_test_skipped: bool | None
+    radio_disconnection: bool | None
+    legionella_risk: bool | None
+    low_water_temperature: bool | None
+
+    @classmethod
+    def from_sections(
+        cls,
+        information: dict[str, Any],
+        settings: dict[str, Any],
+        notification_settings: dict[str, Any],
+    ) -> PropertySnapshot:
+        """Build the snapshot from the property endpoint payloads."""
+        return cls(
+            name=information.get("name"),
+            active=information.get("active"),
+            auto_shut_off=settings.get("auto_shut_off"),
+            pressure_tests_enabled=settings.get("pressure_tests_enabled"),
+            pressure_tests_schedule=settings.get("pressure_tests_schedule"),
+            timezone=settings.get("timezone"),
+            cloud_disconnection=notification_settings.get("cloud_disconnection"),
+            device_handle_moved=notification_settings.get("device_handle_moved"),
+            health_check_failed=notification_settings.get("health_check_failed"),
+            high_volume_threshold_litres=notification_settings.get(
+                "high_volume_threshold_litres"
+            ),
+            long_flow_notification_delay_mins=notification_settings.get(
+                "long_flow_notification_delay_mins"
+            ),
+            low_battery_level=notification_settings.get("low_battery_level"),
+            pressure_test_failed=notification_settings.get("pressure_test_failed"),
+            pressure_test_skipped=notification_settings.get("pressure_test_skipped"),
+            radio_disconnection=notification_settings.get("radio_disconnection"),
+            legionella_risk=notification_settings.get("legionella_risk"),
+            low_water_temperature=notification_settings.get("low_water_temperature"),
+        )
+
+
+class _PendingWrite:
+    """Changes to one property endpoint waiting to be sent as one request."""
+
+    __slots__ = ("section", "changes", "previous", "done")
+
+    def __init__(self, section: str, done: asyncio.Future[None]) -> None:
+        """Initialize an empty batch."""
+        self.section = section
+        self.changes: dict[str, Any] = {}
+        # Values the keys had before the batch, restored if it fails.
+        self.previous: dict[str, Any] = {}
+        self.done = done
+
+
+class PropertyDataUpdateCoordinator(SonicDataUpdateCoordinator):
     """Sonic property object."""
 
-    def __init__(self, hass: HomeAssistant, api_client: Client, property_id: str) -> None:
+    _request_priority = RequestPriority.PROPERTY
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api_client: Client,
+        scheduler: SonicRequestScheduler,
+        property_id: str,
+    ) -> None:
         """Initialize the property."""
         self.hass: HomeAssistant = hass
         self.api_client: Client = api_client
+        self.scheduler: SonicRequestScheduler = scheduler
         self._sonic_property_id: str = property_id
         self._property_information: dict[str, Any] = {}
         self._property_settings: dict[str, Any] = {}
         self._property_notification_settings: dict[str, Any] = {}
+        self.snapshot = PropertySnapshot.from_sections({}, {}, {})
+        self._time_zone: tzinfo | None = None
+        # Batches not confirmed by the cloud yet, oldest first, at most one
+        # per endpoint still collecting changes.
+        self._unconfirmed_writes: list[_PendingWrite] = []
+        self._collecting_writes: dict[str, _PendingWrite] = {}
+        self._write_tasks: set[asyncio.Task[None]] = set()
         super().__init__(
             hass,
             LOGGER,
             name=f"{SONIC_DOMAIN}-{property_id}",
             update_interval=timedelta(seconds=3600),
         )
+        self._phase = phase_offset(property_id)
 
     async def _async_update_data(self):
-        """Update data via library."""
-        try:
-            async with timeout(10):
-                await asyncio.gather(
-                    *[
-                        self._update_property(),
-                    ]
-                )
-        except (RequestError) as error:
-            raise UpdateFailed(error) from error
+        """Update data via library.
+
+        The three endpoints are independent, so they are requested concurrently
+        with a deadline each and every successful response is kept. The update
+        only fails when no endpoint answered, entities reading a section that
+        failed keep its last payload until it is stale."""
+        results = await asyncio.gather(
+            self._async_fetch(
+                self.api_client.property.async_get_property_details,
+                self._sonic_property_id,
+            ),
+            self._async_fetch(
+                self.api_client.property.async_get_property_settings,
+                self._sonic_property_id,
+            ),
+            self._async_fetch(
+                self.api_client.property.async_get_property_notification_settings,
+                self._sonic_property_id,
+            ),
+            return_exceptions=True,
+        )
+        information, settings, notification_settings = results
+        if not isinstance(information, BaseException):
+            self._property_information = information
+        if not isinstance(settings, BaseException):
+            self._property_settings = settings
+        if not isinstance(notification_settings, BaseException):
+            self._property_notification_settings = notification_settings
+        for section, result in zip(PROPERTY_SECTIONS, results):
+            if not isinstance(result, BaseException):
+                self._async_section_updated(section)
+        for write in self._unconfirmed_writes:
+            # Keep showing the changes the cloud has not confirmed yet.
+            self._set_section(write.section, write.changes)
+        self._changed_fields = self._async_rebuild_snapshot()
+
+        errors = [result for result in results if isinstance(result, BaseException)]
+        for error in errors:
+            if not isinstance(error, API_ERRORS):
+                raise error
+        if len(errors) == len(results):
+            raise UpdateFailed(errors[0]) from errors[0]
+        if errors:
+            LOGGER.debug(
+                "Unable to update %d sections of property %s: %s",
+                len(errors),
+                self._sonic_property_id,
+                errors[0],
+            )
+            # Let every entity check whether its section is getting stale.
+            self._changed_fields = None
 
     @property
     def id(self) -> str:
         """Return Sonic property id."""
         return self._sonic_property_id
 
+    @property
+    def property_sections(self) -> dict[str, dict[str, Any]]:
+        """Return the latest payload of each property endpoint."""
+        return {
+            "information": self._property_information,
+            "settings": self._property_settings,
+            "notification_settings": self._property_notification_settings,
+        }
+
+    @staticmethod
+    def field_sections(fields: tuple[str, ...]) -> set[str]:
+        """Return the sections the snapshot fields are read from."""
+        return {
+            section
+            for section, section_fields in PROPERTY_SECTIONS.items()
+            if not section_fields.isdisjoint(fields)
+        }
+
+    @callback
+    def async_set_property_information(self, information: dict[str, Any]) -> None:
+        """Set the details of the property found in the property listing, so
+        its name is known before the first refresh."""
+        self._property_information = information
+        self.snapshot = self._build_snapshot()
+        self._time_zone = None
+        self._async_section_updated("information")
+
+    @callback
+    def async_restore_sections(
+        self, sections: dict[str, dict[str, Any]], updated_at: dict[str, str]
+    ) -> None:
+        """Restore the property payloads cached by a previous run."""
+        self._property_information = sections["information"]
+        self._property_settings = sections["settings"]
+        self._property_notification_settings = sections["notification_settings"]
+        self.snapshot = self._build_snapshot()
+        self._time_zone = None
+        self._async_restore_section_times(updated_at)
+
+    @callback
+    def _async_rebuild_snapshot(self) -> set[str]:
+        """Rebuild the snapshot and return the fields that changed."""
+        snapshot = self._build_snapshot()
+        changed = changed_fields(self.snapshot, snapshot)
+        if "timezone" in changed:
+            self._time_zone = None
+        self.snapshot = snapshot
+        return changed
+
+    def _build_snapshot(self) -> PropertySnapshot:
+        """Build the snapshot of the latest property payloads."""
+        return PropertySnapshot.from_sections(
+            self._property_information,
+            self._property_settings,
+            self._property_notification_settings,
+        )
+
+    @property
+    def time_zone(self) -> tzinfo:
+        """Return the time zone of the property.
+
+        The zone object is looked up once per zone name rather than on every
+        telemetry update, falling back to the Home Assistant time zone."""
+        if self._time_zone is None:
+            if self.snapshot.timezone is None:
+                return dt_util.DEFAULT_TIME_ZONE
+            self._time_zone = dt_util.get_time_zone(self.snapshot.timezone)
+            if self._time_zone is None:
+                LOGGER.warning(
+                    "Unknown time zone %s at property %s",
+                    self.snapshot.timezone,
+                    self._sonic_property_id,
+                )
+                self._time_zone = dt_util.DEFAULT_TIME_ZONE
+        return self._time_zone
+
     @property
     def property_name(self) -> str:
         """Return property name."""
-        return self._property_information["name"]
+        return self.snapshot.name
 
     @property
     def property_active(self) -> bool:
         """Return True if property is active."""
-        return self._property_information["active"]
+        return self.snapshot.active
 
     @property
     def property_auto_shut_off(self) -> bool:
         """Return True if auto shut off is enabled at property."""
-        return self._property_settings["auto_shut_off"]
+        return self.snapshot.auto_shut_off
 
     @property
     def property_pressure_tests_enabled(self) -> bool:
         """Return True if pressure tests are enabled at property."""
-        return self._property_settings["pressure_tests_enabled"]
+        return self.snapshot.pressure_tests_enabled
 
     @property
     def property_pressure_tests_schedule(self) -> str:
         """Returns the time that pressure tests are enabled at property.
         The format is HH:MM:SS in 24h clock"""
-        return self._property_settings["pressure_tests_schedule"]
+        return self.snapshot.pressure_tests_schedule
 
     @property
     def property_timezone(self) -> str:
         """Return the timezone set at property."""
-        return self._property_settings["timezone"]
+        return self.snapshot.timezone
 
     @property
     def property_cloud_disconnection(self) -> bool:
         """Return True if the cloud disconnection notification is enabled at property."""
-        return self._property_notification_settings["cloud_disconnection"]
+        return self.snapshot.cloud_disconnection
 
     @property
     def property_device_handle_moved(self) -> bool:
         """Return True if the device handle moved notification is enabled at property."""
-        return self._property_notification_settings["device_handle_moved"]
+        return self.snapshot.device_handle_moved
 
     @property
     def property_health_check_failed(self) -> bool:
         """Return True if the health check failed notification is enabled at property."""
-        return self._property_notification_settings["health_check_failed"]
+        return self.snapshot.health_check_failed
 
     @property
     def property_high_volume_threshold_litres(self) -> int:
         """Return the high volume threshold litres at property."""
-        return self._property_notification_settings["high_volume_threshold_litres"]
+        return self.snapshot.high_volume_threshold_litres
 
     @property
     def property_long_flow_notification_delay_mins(self) -> int:
         """Return the long flow notification delay in minutes at property."""
-        return self._property_notification_settings["long_flow_notification_delay_mins"]
+        return self.snapshot.long_flow_notification_delay_mins
 
     @property
     def property_low_battery_level(self) -> bool:
         """Return True if the low battery level notification is enabled at property."""
-        return self._property_notification_settings["low_battery_level"]
+        return self.snapshot.low_battery_level
 
     @property
     def property_pressure_test_failed(self) -> bool:
         """Return True if the pressure test failed notification is enabled at property."""
-        return self._property_notification_settings["pressure_test_failed"]
+        return self.snapshot.pressure_test_failed
 
     @property
     def property_pressure_test_skipped(self) -> bool:
         """Return True if the pressure test skipped notification is enabled at property."""
-        return self._property_notification_settings["pressure_test_skipped"]
+        return self.snapshot.pressure_test_skipped
 
     @property
     def property_radio_disconnection(self) -> bool:
         """Return True if the radio disconnection notification is enabled at property."""
-        return self._property_notification_settings["radio_disconnection"]
+        return self.snapshot.radio_disconnection
 
     @property
     def property_legionella_check(self) -> bool:
         """Return True if the legionella check notification is enabled at property."""
-        return self._property_notification_settings["legionella_risk"]
+        return self.snapshot.legionella_risk
 
     @property
     def property_low_water_temperature_check(self) -> bool:
         """Return True if the low water temperature notification is enabled at property."""
-        return self._property_notification_settings["low_water_temperature"]
+        return self.snapshot.low_water_temperature
 
-    async def _update_property(self, *_) -> None:
-        """Update the property information from the API."""
-        self._property_information = await self.api_client.property.async_get_property_details(
-            self._sonic_property_id
-        )
-        self._property_settings = (
-            await self.api_client.property.async_get_property_settings(
-                self._sonic_property_id
-            )
-        )
-        self._property_notification_settings = (
-            await self.api_client.property.async_get_property_notification_settings(
-                self._sonic_property_id
+    async def async_update_property_settings(self, settings: dict[str, Any]) -> None:
+        """Update the property settings."""
+        await self._async_write("settings", settings)
+
+    async def async_update_property_notifications(self, notifications: dict[str, Any]) -> None:
+        """Update the property notification settings."""
+        await self._async_write("notification_settings", notifications)
+
+    def _section(self, section: str) -> dict[str, Any]:
+        """Return the latest payload of a writable property endpoint."""
+        if section == "settings":
+            return self._property_settings
+        return self._property_notification_settings
+
+    def _set_section(self, section: str, values: dict[str, Any]) -> None:
+        """Replace some values of a writable property endpoint payload.
+
+        The payload is copied rather than updated in place as the traces of
+        past update cycles keep references to it."""
+        if section == "settings":
+            self._property_settings = {**self._property_settings, **values}
+        else:
+            self._property_notification_settings = {
+                **self._property_notification_settings,
+                **values,
+            }
+
+    async def _async_write(self, section: str, changes: dict[str, Any]) -> None:
+        """Apply changes optimistically and send them with any other change
+        made to the same endpoint within the coalescing delay.
+
+        Raises the error of the request when it fails, the changes of the
+        whole batch are then rolled back."""
+        if (write := self._collecting_writes.get(section)) is None:
+            write = _PendingWrite(section, self.hass.loop.create_future())
+            self._collecting_writes[section] = write
+            self._unconfirmed_writes.append(write)
+            task = self.hass.async_create_background_task(
+                self._async_send_write(write),
+                f"{self.name} {section} write",
             )
+            self._write_tasks.add(task)
+            task.add_done_callback(self._write_tasks.discard)
+        current = self._section(section)
+        for key in changes:
+            write.previous.setdefault(key, current.get(key))
+        write.changes.update(changes)
+        self._set_section(section, changes)
+        self._async_notify_listeners(self._async_rebuild_snapshot())
+        await asyncio.shield(write.done)
+
+    async def _async_send_write(self, write: _PendingWrite) -> None:
+        """Send a batch of changes once the coalescing delay has passed."""
+        await asyncio.sleep(WRITE_COALESCE_DELAY.total_seconds())
+        del self._collecting_writes[write.section]
+        if write.section == "settings":
+            method = self.api_client.property.async_update_property_settings
+        else:
+            method = self.api_client.property.async_update_property_notifications
+        LOGGER.debug(
+            "Sending %s %s changes of property %s",
+            len(write.changes),
+            write.section,
+            self._sonic_property_id,
         )
-        LOGGER.debug("Sonic property data: %s", self._property_information)
-        LOGGER.debug("Sonic property settings: %s", self._property_settings)
-        LOGGER.debug("Sonic property notification settings: %s", self._property_notification_settings)
+        try:
+            await self._async_fetch(method, self._sonic_property_id, write.changes)
+        except Exception as err:  # pylint: disable=broad-except
+            self._unconfirmed_writes.remove(write)
+            self._async_roll_back(write)
+            write.done.set_exception(err)
+        else:
+            self._unconfirmed_writes.remove(write)
+            write.done.set_result(None)
+
+    @callback
+    def _async_roll_back(self, write: _PendingWrite) -> None:
+        """Restore the values a failed batch changed.
+
+        Keys changed again by a later batch keep that change, the later
+        batch restores the original value should it fail as well."""
+        restored = {}
+        for key, value in write.previous.items():
+            for later in self._unconfirmed_writes:
+                if later.section == write.section and key in later.changes:
+                    later.previous[key] = value
+                    break
+            else:
+                restored[key] = value
+        self._set_section(write.section, restored)
+        self._async_notify_listeners(self._async_rebuild_snapshot())
+
+    async def async_shutdown(self) -> None:
+        """Cancel the pending writes and any scheduled call."""
+        for task in self._write_tasks:
+            task.cancel()
+        for write in self._unconfirmed_writes:
+            if not write.done.done():
+                write.done.cancel()
+        await super().async_shutdown()
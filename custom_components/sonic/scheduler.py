@@ -0,0 +1,259 @@
+"""Account wide request scheduler for the Hero Labs API."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from enum import IntEnum
+import heapq
+from http import HTTPStatus
+import itertools
+from typing import Any, TypeVar
+
+from aiohttp import ClientError, ClientResponseError
+from herolabsapi.errors import (
+    HeroLabsError,
+    RequestError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
+)
+
+from .breaker import CircuitBreaker, CircuitOpenError
+from .const import DEFAULT_REQUEST_RATE, LOGGER, REQUEST_TIMEOUT
+from .instrumentation import RequestInstrumentation, RequestOutcome
+
+_T = TypeVar("_T")
+
+# Requests let through at once on top of the sustained rate.
+DEFAULT_REQUEST_BURST = 20
+
+# Pause in seconds applied to the whole account after the cloud throttles us,
+# doubled on every consecutive throttle up to the maximum.
+THROTTLE_BACKOFF_MIN = 5.0
+THROTTLE_BACKOFF_MAX = 300.0
+THROTTLE_RETRIES = 3
+
+# Errors counted by the circuit breaker, throttling has its own backoff.
+OUTAGE_ERRORS = (RequestError, ServiceUnavailableError, asyncio.TimeoutError, ClientError)
+
+
+def _as_throttle_error(err: Exception) -> HeroLabsError | None:
+    """Return the error as the cloud throttling us, None if it is not.
+
+    herolabsapi raises every HTTP error as a RequestError caused by the
+    aiohttp response error, so 429 and 503 are told apart by its status."""
+    if isinstance(err, (TooManyRequestsError, ServiceUnavailableError)):
+        return err
+    if isinstance(err, RequestError) and isinstance(
+        cause := err.__cause__, ClientResponseError
+    ):
+        if cause.status == HTTPStatus.TOO_MANY_REQUESTS:
+            return TooManyRequestsError(str(err))
+        if cause.status == HTTPStatus.SERVICE_UNAVAILABLE:
+            return ServiceUnavailableError(str(err))
+    return None
+
+
+class RequestPriority(IntEnum):
+    """Priority lanes of the request scheduler, lowest value served first."""
+
+    VALVE = 0
+    TELEMETRY = 1
+    PROPERTY = 2
+
+
+class SonicRequestScheduler:
+    """Token bucket shared by every request made for one Hero Labs account.
+
+    Requests wait for a token in their priority lane, so valve commands go
+    ahead of telemetry and telemetry goes ahead of property settings. When
+    the cloud answers with too many requests or service unavailable the
+    whole account pauses with an exponential backoff instead of every
+    coordinator failing on its own. While the cloud is down altogether the
+    circuit breaker of the account stops polling requests from being sent."""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_REQUEST_RATE,
+        burst: int = DEFAULT_REQUEST_BURST,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._rate: float = rate
+        self._capacity: float = float(burst)
+        self._tokens: float = float(burst)
+        self._updated_at: float | None = None
+        self._paused_until: float = 0.0
+        self._backoff: float = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+        self.instrumentation = RequestInstrumentation()
+        self.breaker = CircuitBreaker()
+
+    @property
+    def queued(self) -> int:
+        """Return the number of requests waiting for a token."""
+        return sum(1 for *_, waiter in self._waiters if not waiter.done())
+
+    @property
+    def throttled(self) -> bool:
+        """Return True while the account is paused after a throttle."""
+        return asyncio.get_running_loop().time() < self._paused_until
+
+    async def async_request(
+        self,
+        priority: RequestPriority,
+        method: Callable[..., Awaitable[_T]],
+        *args: Any,
+        instrumentation: RequestInstrumentation | None = None,
+    ) -> _T:
+        """Call an API endpoint unless the circuit breaker holds it back.
+
+        Valve commands and their follow up are always sent, they are rare,
+        asked for by the user and tell whether the cloud is back as well as
+        a probe would."""
+        loop = asyncio.get_running_loop()
+        if priority is not RequestPriority.VALVE and not self.breaker.allow_request(
+            loop.time()
+        ):
+            raise CircuitOpenError("The Hero Labs cloud is unreachable")
+        try:
+            result = await self._async_request(
+                priority, method, *args, instrumentation=instrumentation
+            )
+        except OUTAGE_ERRORS as err:
+            self.breaker.record_failure(loop.time(), err)
+            raise
+        except BaseException:
+            self.breaker.release_probe(loop.time())
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def _async_request(
+        self,
+        priority: RequestPriority,
+        method: Callable[..., Awaitable[_T]],
+        *args: Any,
+        instrumentation: RequestInstrumentation | None = None,
+    ) -> _T:
+        """Call an API endpoint once a token is available in its lane.
+
+        The request deadline only covers the call itself, not the time spent
+        waiting for a token, and so does the latency recorded for the account
+        and the optional instrumentation of the caller."""
+        attempt = 0
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._async_acquire(priority)
+            started = loop.time()
+            outcome = RequestOutcome.ERROR
+            try:
+                async with asyncio.timeout(REQUEST_TIMEOUT):
+                    result = await method(*args)
+                outcome = RequestOutcome.SUCCESS
+            except asyncio.TimeoutError:
+                outcome = RequestOutcome.TIMEOUT
+                raise
+            except HeroLabsError as err:
+                if (throttle_error := _as_throttle_error(err)) is None:
+                    raise
+                outcome = RequestOutcome.THROTTLED
+                self._async_throttle()
+                attempt += 1
+                if (
+                    isinstance(throttle_error, TooManyRequestsError)
+                    and attempt < THROTTLE_RETRIES
+                ):
+                    continue
+                # Raised as its own type, so the circuit breaker counts a 503
+                # as an outage straight away and leaves a 429 alone.
+                if throttle_error is err:
+                    raise
+                raise throttle_error from err
+            finally:
+                latency = loop.time() - started
+                self.instrumentation.record(method.__name__, latency, outcome)
+                if instrumentation is not None:
+                    instrumentation.record(method.__name__, latency, outcome)
+            self._backoff = 0.0
+            return result
+
+    async def _async_acquire(self, priority: RequestPriority) -> None:
+        """Wait until a token is granted to this request."""
+        if not self._waiters and self._try_take_token():
+            return
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The token was granted just before cancellation, hand it on.
+                self._tokens += 1
+                self._dispatch()
+            raise
+
+    def _refill(self) -> float:
+        """Add the tokens earned since the last refill and return the time."""
+        now = asyncio.get_running_loop().time()
+        if self._updated_at is not None:
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated_at) * self._rate
+            )
+        self._updated_at = now
+        return now
+
+    def _try_take_token(self) -> bool:
+        """Take a token if one is available and the account is not paused."""
+        now = self._refill()
+        if now < self._paused_until or self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _dispatch(self) -> None:
+        """Grant tokens to waiting requests in priority order."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        while self._waiters:
+            *_, waiter = self._waiters[0]
+            if waiter.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._try_take_token():
+                break
+            heapq.heappop(self._waiters)
+            waiter.set_result(None)
+        if not self._waiters:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        wake_at = max(
+            self._paused_until, now + max(0.0, 1 - self._tokens) / self._rate
+        )
+        self._wakeup = loop.call_at(wake_at, self._dispatch)
+
+    def _async_throttle(self) -> None:
+        """Pause every request on the account with an exponential backoff."""
+        self._backoff = min(
+            max(self._backoff * 2, THROTTLE_BACKOFF_MIN), THROTTLE_BACKOFF_MAX
+        )
+        loop = asyncio.get_running_loop()
+        self._paused_until = max(self._paused_until, loop.time() + self._backoff)
+        LOGGER.warning(
+            "Hero Labs API is throttling requests, pausing for %.0f seconds",
+            self._backoff,
+        )
+        self._dispatch()
+
+    def async_shutdown(self) -> None:
+        """Cancel the pending wakeup and every waiting request."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        for *_, waiter in self._waiters:
+            if not waiter.done():
+                waiter.cancel()
+        self._waiters.clear()
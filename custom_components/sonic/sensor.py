@@ -1,7 +1,7 @@
 """The Sonic Water Shut-off Valve integration."""
 from __future__ import annotations
-from datetime import datetime
-import pytz
+from datetime import datetime, timedelta
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -22,7 +22,10 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import DOMAIN as SONIC_DOMAIN, LOGGER
 from .device import SonicDeviceDataUpdateCoordinator
 from .property import PropertyDataUpdateCoordinator
-from .entity import SonicEntity, PropertyEntity
+from .entity import SonicAccountEntity, SonicEntity, PropertyEntity
+from .history import HISTORY_METRICS
+from .instrumentation import EndpointStatistics
+from .scheduler import SonicRequestScheduler
 
 WATER_ICON = "mdi:water"
 GAUGE_ICON = "mdi:gauge"
@@ -41,6 +44,38 @@ NAME_AUTO_SHUT_OFF_VOLUME_LIMIT = "Auto Shut Off Volume Limit"
 NAME_LONG_FLOW_NOTIFICATION_DELAY = "Long Flow Notification Time Delay"
 NAME_HIGH_VOLUME_THRESHOLD_LITRES = "High Volume Notification Threshold"
 NAME_TELEMETRYTIME = "Telemetry Data Timestamp"
+NAME_TELEMETRY_LATENCY = "Telemetry Request Latency"
+NAME_LAST_UPDATE_DURATION = "Last Update Duration"
+NAME_FLEET_UPDATE_DURATION = "Device Details Update Duration"
+
+# Account diagnostic sensors publish the in-memory request statistics.
+SCAN_INTERVAL = timedelta(minutes=1)
+
+# API endpoints with a latency sensor on the account, by library method.
+API_ENDPOINT_NAMES = {
+    "async_get_all_sonic_details": "Sonic Details",
+    "async_get_sonic_details": "Single Sonic Details",
+    "async_sonic_telemetry_by_id": "Telemetry",
+    "async_open_sonic_valve": "Open Valve",
+    "async_close_sonic_valve": "Close Valve",
+    "async_get_property_details": "Property Details",
+    "async_get_property_settings": "Property Settings",
+    "async_get_property_notification_settings": "Property Notification Settings",
+    "async_update_property_settings": "Update Property Settings",
+    "async_update_property_notifications": "Update Property Notifications",
+}
+
+# Name, unit, device class and icon of the metrics with rolling statistics.
+STATISTICS_METRICS: dict[str, tuple[str, str, SensorDeviceClass | None, str | None]] = {
+    "flow_rate": (NAME_FLOW_RATE, "litres per min", None, GAUGE_ICON),
+    "pressure": (NAME_WATER_PRESSURE, UnitOfPressure.BAR, SensorDeviceClass.PRESSURE, None),
+    "temperature": (
+        NAME_WATER_TEMPERATURE,
+        UnitOfTemperature.CELSIUS,
+        SensorDeviceClass.TEMPERATURE,
+        None,
+    ),
+}
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -51,7 +86,16 @@ async def async_setup_entry(
     devices: list[SonicDeviceDataUpdateCoordinator] = hass.data[SONIC_DOMAIN][
         config_entry.entry_id
     ]["devices"]
-    entities = []
+    entry_data = hass.data[SONIC_DOMAIN][config_entry.entry_id]
+    entities = [
+        SonicEndpointLatencySensor(
+            config_entry.entry_id, entry_data["scheduler"], endpoint, name
+        )
+        for endpoint, name in API_ENDPOINT_NAMES.items()
+    ]
+    entities.append(
+        SonicFleetUpdateDurationSensor(config_entry.entry_id, entry_data["fleet"])
+    )
     for device in devices:
         entities.extend(
             [
@@ -64,8 +108,15 @@ async def async_setup_entry(
                 SonicDeviceStatusSensor(device),
                 SonicAutoShutOffTimeLimitSensor(device),
                 SonicAutoShutOffVolumeLimitSensor(device),
+                SonicTelemetryLatencySensor(device),
+                SonicLastUpdateDurationSensor(device),
             ]
         )
+        for window_type, window in zip(("short", "long"), device.history.windows):
+            entities.extend(
+                SonicTelemetryStatisticsSensor(device, metric, window_type, window)
+                for metric in HISTORY_METRICS
+            )
     """Set up the Property sensors from config entry."""
     properties: list[PropertyDataUpdateCoordinator] = hass.data[SONIC_DOMAIN][
         config_entry.entry_id
@@ -75,6 +126,7 @@ async def async_setup_entry(
             [
                 PropertyLongFlowNotificationDelay(property),
                 PropertyHighVolumeNotificationThresholdLitres(property),
+                PropertyLastUpdateDurationSensor(property),
             ]
         )
     async_add_entities(entities)
@@ -86,6 +138,7 @@ class SonicCurrentFlowRateSensor(SonicEntity, SensorEntity):
     _attr_icon = GAUGE_ICON
     _attr_native_unit_of_measurement = "litres per min"
     _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    _source_fields = ("flow_rate",)
 
     def __init__(self, device):
         """Initialize the flow rate sensor."""
@@ -95,9 +148,7 @@ class SonicCurrentFlowRateSensor(SonicEntity, SensorEntity):
     @property
     def native_value(self) -> float | None:
         """Return the current flow rate in Litre per minute."""
-        if self._device.current_flow_rate is None:
-            return None
-        return round(((self._device.current_flow_rate)/1000), 1)
+        return self._device.telemetry.flow_rate
 
 
 class SonicTemperatureSensor(SonicEntity, SensorEntity):
@@ -106,6 +157,7 @@ class SonicTemperatureSensor(SonicEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.TEMPERATURE
     _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
     _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    _source_fields = ("temperature",)
 
     def __init__(self, device):
         """Initialize the temperature sensor."""
@@ -115,9 +167,7 @@ class SonicTemperatureSensor(SonicEntity, SensorEntity):
     @property
     def native_value(self) -> float | None:
         """Return the current temperature."""
-        if self._device.temperature is None:
-            return None
-        return round(self._device.temperature, 1)
+        return self._device.telemetry.temperature
 
 
 class SonicPressureSensor(SonicEntity, SensorEntity):
@@ -126,6 +176,7 @@ class SonicPressureSensor(SonicEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.PRESSURE
     _attr_native_unit_of_measurement = UnitOfPressure.BAR
     _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    _source_fields = ("pressure",)
 
     def __init__(self, device):
         """Initialize the water pressure sensor."""
@@ -135,9 +186,56 @@ class SonicPressureSensor(SonicEntity, SensorEntity):
     @property
     def native_value(self) -> float | None:
         """Return the current water pressure in bar."""
-        if self._device.current_mbar is None:
+        return self._device.telemetry.pressure
+
+
+class SonicTelemetryStatisticsSensor(SonicEntity, SensorEntity):
+    """Rolling average of a telemetry metric, with its minimum, maximum and
+    standard deviation over the same window as attributes."""
+
+    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    _source_fields = ("history",)
+
+    def __init__(self, device, metric: str, window_type: str, window: timedelta):
+        """Initialize the statistics sensor."""
+        name, unit, device_class, icon = STATISTICS_METRICS[metric]
+        minutes = int(window.total_seconds() // 60)
+        if minutes % 60:
+            window_name = f"{minutes} Minute"
+        else:
+            window_name = f"{minutes // 60} Hour"
+        super().__init__(
+            f"{metric}_{window_type}_statistics", f"{name} {window_name} Average", device
+        )
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_icon = icon
+        self._metric: str = metric
+        self._window: timedelta = window
+        # The average stays meaningful while the window holds samples.
+        self._stale_after = window
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the average over the window."""
+        statistics = self._device.history.statistics(self._window, self._metric)
+        if statistics is None:
             return None
-        return round(((self._device.current_mbar)/1000), 1)
+        return round(statistics.mean, 2)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the minimum, maximum and standard deviation over the window."""
+        statistics = self._device.history.statistics(self._window, self._metric)
+        if statistics is None:
+            return self._stale_attributes
+        return {
+            "min": statistics.minimum,
+            "max": statistics.maximum,
+            "stddev": round(statistics.stddev, 3),
+            "samples": statistics.samples,
+            **self._stale_attributes,
+        }
 
 
 class SonicBatterySensor(SonicEntity, SensorEntity):
@@ -146,6 +244,8 @@ class SonicBatterySensor(SonicEntity, SensorEntity):
     _attr_icon = BATTERY_ICON
     # _attr_native_unit_of_measurement = "battery"
     # _attr_state_class: SensorStateClass = SensorStateClass.None
+    _configuration_entity = True
+    _source_fields = ("battery",)
 
     def __init__(self, device):
         """Initialize the battery sensor."""
@@ -155,7 +255,7 @@ class SonicBatterySensor(SonicEntity, SensorEntity):
     @property
     def native_value(self) -> str | None:
         """Return the current battery state."""
-        return self._device.battery_state
+        return self._device.configuration.battery
 
 
 class SonicTelemetryTime(SonicEntity, SensorEntity):
@@ -164,6 +264,7 @@ class SonicTelemetryTime(SonicEntity, SensorEntity):
     _attr_icon = TIMER_ICON
     _attr_device_class = SensorDeviceClass.TIMESTAMP
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _source_fields = ("probed_at",)
 
     def __init__(self, device):
         """Initialize the telemetry time sensor."""
@@ -171,13 +272,9 @@ class SonicTelemetryTime(SonicEntity, SensorEntity):
         self._state: str = None
 
     @property
-    def native_value(self) -> str | None:
+    def native_value(self) -> datetime | None:
         """Return the current telemetry time state."""
-        telemetry_timestamp = self._device.last_heard_from_time
-        # telemetry_timezone = self._device.property_timezone
-        timezone = pytz.timezone("Europe/London")
-        telemetry_datetime = datetime.fromtimestamp(telemetry_timestamp, timezone)
-        return telemetry_datetime
+        return self._device.telemetry.probed_at
 
 
 class SonicValveStateSensor(SonicEntity, SensorEntity):
@@ -185,6 +282,8 @@ class SonicValveStateSensor(SonicEntity, SensorEntity):
        Options are: 'open, closed, opening, closing, faulty, pressure_test, requested_open, requested_closed' """
 
     _attr_icon = VALVE_ICON
+    _configuration_entity = True
+    _source_fields = ("valve_state",)
 
     def __init__(self, device):
         """Initialize the current valve state sensor."""
@@ -194,15 +293,15 @@ class SonicValveStateSensor(SonicEntity, SensorEntity):
     @property
     def native_value(self) -> str | None:
         """Return the current valve state state."""
-        if not self._device.last_heard_from_time:
-            return None
-        return self._device.last_known_valve_state
+        return self._device.configuration.valve_state
 
 
 class SonicDeviceStatusSensor(SonicEntity, SensorEntity):
     """Return any sonic status message"""
 
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _configuration_entity = True
+    _source_fields = ("status",)
 
     def __init__(self, device):
         """Initialize the device status sensor."""
@@ -212,9 +311,7 @@ class SonicDeviceStatusSensor(SonicEntity, SensorEntity):
     @property
     def native_value(self) -> str | None:
         """Return the device status state."""
-        if not self._device.sonic_status:
-            return None
-        return self._device.sonic_status
+        return self._device.configuration.status
 
 
 class SonicAutoShutOffTimeLimitSensor(SonicEntity, SensorEntity):
@@ -223,6 +320,8 @@ class SonicAutoShutOffTimeLimitSensor(SonicEntity, SensorEntity):
     _attr_icon = TIMER_ICON
     _attr_native_unit_of_measurement = UnitOfTime.MINUTES
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _configuration_entity = True
+    _source_fields = ("auto_shut_off_time_limit",)
 
     def __init__(self, device):
         """Initialize the auto_shut_off_time_limit sensor."""
@@ -232,7 +331,7 @@ class SonicAutoShutOffTimeLimitSensor(SonicEntity, SensorEntity):
     @property
     def native_value(self) -> int | None:
         """Return the auto_shut_off_time_limit state in minutes."""
-        return round((self._device.auto_shut_off_time_limit)/60)
+        return self._device.configuration.auto_shut_off_time_limit
 
 
 class SonicAutoShutOffVolumeLimitSensor(SonicEntity, SensorEntity):
@@ -241,6 +340,8 @@ class SonicAutoShutOffVolumeLimitSensor(SonicEntity, SensorEntity):
     _attr_icon = VOLUME_ICON
     _attr_native_unit_of_measurement = UnitOfVolume.LITERS
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _configuration_entity = True
+    _source_fields = ("auto_shut_off_volume_limit",)
 
     def __init__(self, device):
         """Initialize the auto_shut_off_volume_limit sensor."""
@@ -250,7 +351,7 @@ class SonicAutoShutOffVolumeLimitSensor(SonicEntity, SensorEntity):
     @property
     def native_value(self) -> int | None:
         """Return the auto_shut_off_volume_limit state."""
-        return round((self._device.auto_shut_off_volume_limit)/1000)
+        return self._device.configuration.auto_shut_off_volume_limit
 
 class PropertyLongFlowNotificationDelay(PropertyEntity, SensorEntity):
     """Return the long flow notification delay in minutes at property"""
@@ -258,6 +359,7 @@ class PropertyLongFlowNotificationDelay(PropertyEntity, SensorEntity):
     _attr_icon = TIMER_ICON
     _attr_native_unit_of_measurement = UnitOfTime.MINUTES
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _source_fields = ("long_flow_notification_delay_mins",)
 
     def __init__(self, property):
         """Initialize the property_long_flow_notification_delay_mins sensor."""
@@ -267,7 +369,7 @@ class PropertyLongFlowNotificationDelay(PropertyEntity, SensorEntity):
     @property
     def native_value(self) -> int | None:
         """Return the property_long_flow_notification_delay in minutes."""
-        return self._device.property_long_flow_notification_delay_mins
+        return self._device.snapshot.long_flow_notification_delay_mins
 
 class PropertyHighVolumeNotificationThresholdLitres(PropertyEntity, SensorEntity):
     """Return the high_volume_threshold_litres at property"""
@@ -275,6 +377,7 @@ class PropertyHighVolumeNotificationThresholdLitres(PropertyEntity, SensorEntity
     _attr_icon = TIMER_ICON
     _attr_native_unit_of_measurement = UnitOfVolume.LITERS
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _source_fields = ("high_volume_threshold_litres",)
 
     def __init__(self, property):
         """Initialize the property_high_volume_threshold_litres sensor."""
@@ -284,4 +387,147 @@ class PropertyHighVolumeNotificationThresholdLitres(PropertyEntity, SensorEntity
     @property
     def native_value(self) -> int | None:
         """Return the property_high_volume_threshold_litres."""
-        return self._device.property_high_volume_threshold_litres
+        return self._device.snapshot.high_volume_threshold_litres
+
+
+def _latency_attributes(statistics: EndpointStatistics | None) -> dict[str, Any]:
+    """Return the request counters and latency histogram of an endpoint."""
+    if statistics is None:
+        return {}
+    return statistics.as_dict()
+
+
+class SonicTelemetryLatencySensor(SonicEntity, SensorEntity):
+    """Moving average latency of the telemetry requests of the device."""
+
+    _attr_icon = TIMER_ICON
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _source_fields = ("timing",)
+
+    def __init__(self, device):
+        """Initialize the telemetry latency sensor."""
+        super().__init__("telemetry_latency", NAME_TELEMETRY_LATENCY, device)
+
+    @property
+    def available(self) -> bool:
+        """Return True once a telemetry request was made."""
+        return super().available and self._statistics is not None
+
+    @property
+    def _statistics(self) -> EndpointStatistics | None:
+        """Return the statistics of the telemetry endpoint of the device."""
+        return self._device.request_statistics.get("async_sonic_telemetry_by_id")
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the moving average latency in milliseconds."""
+        return self._statistics.as_dict()["latency_average_ms"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the request counters and latency histogram."""
+        return _latency_attributes(self._statistics)
+
+
+class SonicLastUpdateDurationSensor(SonicEntity, SensorEntity):
+    """Duration of the last telemetry update cycle of the device."""
+
+    _attr_icon = TIMER_ICON
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _source_fields = ("timing",)
+
+    def __init__(self, device):
+        """Initialize the last update duration sensor."""
+        super().__init__("last_update_duration", NAME_LAST_UPDATE_DURATION, device)
+
+    @property
+    def available(self) -> bool:
+        """Return True once an update cycle completed."""
+        return super().available and self._device.last_update_duration is not None
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the duration of the last update cycle in seconds."""
+        return round(self._device.last_update_duration, 3)
+
+
+class PropertyLastUpdateDurationSensor(PropertyEntity, SensorEntity):
+    """Duration of the last update cycle of the property settings."""
+
+    _attr_icon = TIMER_ICON
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _source_fields = ("timing",)
+
+    def __init__(self, property):
+        """Initialize the last update duration sensor."""
+        super().__init__("last_update_duration", NAME_LAST_UPDATE_DURATION, property)
+
+    @property
+    def available(self) -> bool:
+        """Return True once an update cycle completed."""
+        return super().available and self._device.last_update_duration is not None
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the duration of the last update cycle in seconds."""
+        return round(self._device.last_update_duration, 3)
+
+
+class SonicEndpointLatencySensor(SonicAccountEntity, SensorEntity):
+    """Moving average latency of an API endpoint across the account, with its
+    request, error, throttle and timeout counters and latency histogram."""
+
+    _attr_icon = TIMER_ICON
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        entry_id: str,
+        scheduler: SonicRequestScheduler,
+        endpoint: str,
+        name: str,
+    ) -> None:
+        """Initialize the endpoint latency sensor."""
+        super().__init__(entry_id, f"{endpoint}_latency", f"{name} Request Latency")
+        self._scheduler: SonicRequestScheduler = scheduler
+        self._endpoint: str = endpoint
+
+    async def async_update(self) -> None:
+        """Publish the latest statistics of the endpoint."""
+        statistics = self._scheduler.instrumentation.get(self._endpoint)
+        attributes = _latency_attributes(statistics)
+        self._attr_native_value = attributes.pop("latency_average_ms", None)
+        self._attr_extra_state_attributes = attributes
+
+
+class SonicFleetUpdateDurationSensor(SonicAccountEntity, SensorEntity):
+    """Duration of the last bulk update of the device details."""
+
+    _attr_icon = TIMER_ICON
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+
+    def __init__(self, entry_id: str, fleet) -> None:
+        """Initialize the fleet update duration sensor."""
+        super().__init__(entry_id, "fleet_update_duration", NAME_FLEET_UPDATE_DURATION)
+        self._fleet = fleet
+
+    async def async_update(self) -> None:
+        """Publish the duration of the last bulk update."""
+        duration = self._fleet.last_update_duration
+        self._attr_native_value = None if duration is None else round(duration, 3)
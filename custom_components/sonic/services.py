@@ -0,0 +1,160 @@
+"""Services of the Sonic integration."""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+import homeassistant.helpers.config_validation as cv
+
+from .const import DOMAIN, LOGGER
+from .coordinator import API_ERRORS
+from .device import SonicDeviceDataUpdateCoordinator
+
+SERVICE_CLOSE_VALVES = "close_valves"
+SERVICE_OPEN_VALVES = "open_valves"
+
+ATTR_CONFIRM = "confirm"
+ATTR_PROPERTY_ID = "property_id"
+ATTR_SIGNAL_ID = "signal_id"
+
+# Valve commands in flight at once over every account, matching the burst
+# the request scheduler of an account lets through without waiting.
+VALVE_COMMAND_CONCURRENCY = 20
+
+VALVES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_PROPERTY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_SIGNAL_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_CONFIRM, default=True): cv.boolean,
+    }
+)
+
+
+def _milliseconds(seconds: float) -> int:
+    """Return a duration in whole milliseconds."""
+    return round(seconds * 1000)
+
+
+@callback
+def _async_matching_devices(
+    hass: HomeAssistant, call: ServiceCall
+) -> list[SonicDeviceDataUpdateCoordinator]:
+    """Return the devices of every account matching the service filters."""
+    property_ids = call.data.get(ATTR_PROPERTY_ID)
+    signal_ids = call.data.get(ATTR_SIGNAL_ID)
+    return [
+        device
+        for entry_data in hass.data.get(DOMAIN, {}).values()
+        for device in entry_data.get("devices", ())
+        if (property_ids is None or device.property_id in property_ids)
+        and (signal_ids is None or device.signal_id in signal_ids)
+    ]
+
+
+async def _async_command_valve(
+    device: SonicDeviceDataUpdateCoordinator,
+    target: str,
+    confirm: bool,
+    semaphore: asyncio.Semaphore,
+) -> dict[str, Any]:
+    """Command the valve of one device and return the outcome and timing."""
+    result: dict[str, Any] = {
+        "device_id": device.id,
+        "name": device.device_name,
+        "property_id": device.property_id,
+    }
+    started = time.monotonic()
+    try:
+        async with semaphore:
+            if target == "open":
+                await device.async_open_valve()
+            else:
+                await device.async_close_valve()
+        result["command_ms"] = _milliseconds(time.monotonic() - started)
+        if not confirm:
+            result["outcome"] = "commanded"
+            return result
+        # The fast follow up polls run outside the semaphore, they go through
+        # the scheduler valve lane and mostly sleep.
+        await device.async_wait_for_valve()
+    except Exception as err:  # pylint: disable=broad-except
+        if not isinstance(err, API_ERRORS):
+            LOGGER.exception("Unexpected error commanding %s", device.device_name)
+        # One device failing must not take the outcome of the others with it.
+        result["outcome"] = "failed"
+        result["error"] = str(err) or type(err).__name__
+        result.setdefault("command_ms", _milliseconds(time.monotonic() - started))
+        return result
+    valve_state = device.configuration.valve_state
+    result["valve_state"] = valve_state
+    if valve_state == target:
+        result["outcome"] = "confirmed"
+        result["confirmed_ms"] = _milliseconds(time.monotonic() - started)
+    elif valve_state == "faulty":
+        result["outcome"] = "faulty"
+    else:
+        result["outcome"] = "unconfirmed"
+    return result
+
+
+async def _async_command_valves(
+    hass: HomeAssistant, call: ServiceCall, target: str
+) -> ServiceResponse:
+    """Command the matching valves in parallel."""
+    devices = _async_matching_devices(hass, call)
+    semaphore = asyncio.Semaphore(VALVE_COMMAND_CONCURRENCY)
+    started = time.monotonic()
+    results = await asyncio.gather(
+        *[
+            _async_command_valve(device, target, call.data[ATTR_CONFIRM], semaphore)
+            for device in devices
+        ]
+    )
+    LOGGER.debug(
+        "Commanded %d valves %s in %.3f seconds",
+        len(devices),
+        target,
+        time.monotonic() - started,
+    )
+    return {
+        "duration_ms": _milliseconds(time.monotonic() - started),
+        "devices": results,
+    }
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_close_valves(call: ServiceCall) -> ServiceResponse:
+        """Close the valves of every matching device."""
+        return await _async_command_valves(hass, call, "closed")
+
+    async def async_open_valves(call: ServiceCall) -> ServiceResponse:
+        """Open the valves of every matching device."""
+        return await _async_command_valves(hass, call, "open")
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CLOSE_VALVES,
+        async_close_valves,
+        schema=VALVES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_OPEN_VALVES,
+        async_open_valves,
+        schema=VALVES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
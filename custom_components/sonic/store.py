@@ -0,0 +1,108 @@
+"""Persistent cache of the last known Sonic state."""
+from __future__ import annotations
+
+from typing import Any, NotRequired, TypedDict
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .coordinator import SonicDataUpdateCoordinator
+from .device import SonicDeviceDataUpdateCoordinator, SonicFleetDataUpdateCoordinator
+from .property import PropertyDataUpdateCoordinator
+
+STORAGE_VERSION = 1
+# Seconds to wait before writing, so a burst of coordinator updates is
+# written to disk once.
+SAVE_DELAY = 30
+
+
+class SonicStateCache(TypedDict):
+    """Last successful payloads of every coordinator of a config entry."""
+
+    devices: list[dict[str, Any]]
+    telemetry: dict[str, dict[str, Any]]
+    properties: dict[str, dict[str, dict[str, Any]]]
+    updated_at: NotRequired[dict[str, dict[str, str]]]
+    """Fetch time of every section by device or property id, "fleet" for the
+    device details. Missing from caches written by older versions."""
+
+
+class SonicStateStore:
+    """Store the last successful payloads so entities can start from them."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store: Store[SonicStateCache] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}"
+        )
+        self._fleet: SonicFleetDataUpdateCoordinator | None = None
+        self._devices: list[SonicDeviceDataUpdateCoordinator] = []
+        self._properties: list[PropertyDataUpdateCoordinator] = []
+
+    async def async_load(self) -> SonicStateCache | None:
+        """Return the cached state, or None when nothing has been stored yet."""
+        return await self._store.async_load()
+
+    async def async_remove(self) -> None:
+        """Remove the cached state."""
+        await self._store.async_remove()
+
+    @callback
+    def async_track(
+        self,
+        fleet: SonicFleetDataUpdateCoordinator,
+        devices: list[SonicDeviceDataUpdateCoordinator],
+        properties: list[PropertyDataUpdateCoordinator],
+    ) -> CALLBACK_TYPE:
+        """Save the state whenever one of the coordinators updates."""
+        self._fleet = fleet
+        self._devices = devices
+        self._properties = properties
+        unsubscribes = [
+            coordinator.async_add_listener(self.async_schedule_save)
+            for coordinator in (fleet, *devices, *properties)
+        ]
+
+        @callback
+        def stop_tracking() -> None:
+            """Stop saving on coordinator updates."""
+            for unsubscribe in unsubscribes:
+                unsubscribe()
+
+        return stop_tracking
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Schedule a delayed write of the current state."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> SonicStateCache:
+        """Return the state of every tracked coordinator."""
+        return {
+            "devices": self._fleet.fleet_information if self._fleet else [],
+            "telemetry": {
+                device.id: device.telemetry_information
+                for device in self._devices
+                if device.telemetry_information
+            },
+            "properties": {
+                property.id: property.property_sections for property in self._properties
+            },
+            "updated_at": {
+                **({"fleet": _section_times(self._fleet)} if self._fleet else {}),
+                **{
+                    coordinator.id: _section_times(coordinator)
+                    for coordinator in (*self._devices, *self._properties)
+                },
+            },
+        }
+
+
+def _section_times(coordinator: SonicDataUpdateCoordinator) -> dict[str, str]:
+    """Return the fetch time of every section of a coordinator."""
+    return {
+        section: updated_at.isoformat()
+        for section, updated_at in coordinator.section_updated_at.items()
+    }
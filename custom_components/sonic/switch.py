@@ -1,6 +1,8 @@
 """Switch representing the Sonic shutoff valve by Hero Labs integration."""
 from __future__ import annotations
 
+from typing import Any
+
 from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
@@ -52,17 +54,24 @@ async def async_setup_entry(
 
 
 class SonicSwitch(SonicEntity, SwitchEntity):
-    """Switch class for the Sonic valve."""
+    """Switch class for the Sonic valve.
+
+    After a command the switch shows the requested position while the valve
+    is followed, with the state reported by the valve as an attribute."""
+
+    _configuration_entity = True
+    _source_fields = ("valve_state", "valve_target")
 
     def __init__(self, device: SonicDeviceDataUpdateCoordinator) -> None:
         """Initialize the Sonic switch."""
         super().__init__("shutoff_valve", "Sonic Valve Switch", device)
-        self._state = self._device.last_known_valve_state == "open"
 
     @property
     def is_on(self) -> bool:
-        """Return True if the valve is open."""
-        return self._state
+        """Return True if the valve is open or being opened."""
+        if self._device.valve_target is not None:
+            return self._device.valve_target == "open"
+        return self._device.configuration.valve_state == "open"
 
     @property
     def icon(self):
@@ -71,32 +80,28 @@ class SonicSwitch(SonicEntity, SwitchEntity):
             return "mdi:valve-open"
         return "mdi:valve-closed"
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state reported by the valve and any pending command."""
+        return {
+            "valve_state": self._device.configuration.valve_state,
+            "command_pending": self._device.valve_target is not None,
+            **self._stale_attributes,
+        }
+
     async def async_turn_on(self, **kwargs) -> None:
         """Open the valve."""
-        await self._device.api_client.sonic.async_open_sonic_valve(self._device.id)
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_open_valve()
 
     async def async_turn_off(self, **kwargs) -> None:
         """Close the valve."""
-        await self._device.api_client.sonic.async_close_sonic_valve(self._device.id)
-        self._state = False
-        self.async_write_ha_state()
-
-    @callback
-    def async_update_state(self) -> None:
-        """Retrieve the latest valve state and update the state machine."""
-        self._state = self._device.last_known_valve_state == "open"
-        self.async_write_ha_state()
-
-    async def async_added_to_hass(self):
-        """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        await self._device.async_close_valve()
 
 
 class AutoShutOffSwitch(PropertyEntity, SwitchEntity):
     """Switch class for the Property AutoShutOff."""
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("auto_shut_off",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property AutoShutOff switch."""
@@ -117,15 +122,11 @@ class AutoShutOffSwitch(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the AutoShutOff Function"""
-        await self._device.api_client.property.async_update_property_settings(self._device.id, {'auto_shut_off': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_settings({'auto_shut_off': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Close the valve."""
-        await self._device.api_client.property.async_update_property_settings(self._device.id, {'auto_shut_off': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_settings({'auto_shut_off': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -135,13 +136,16 @@ class AutoShutOffSwitch(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )
 
 
 class PressureTestsEnabled(PropertyEntity, SwitchEntity):
     """Switch class for the Property pressure_tests_enabled."""
 
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("pressure_tests_enabled",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property Pressure Tests Enabled switch."""
@@ -162,17 +166,11 @@ class PressureTestsEnabled(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the Pressure Tests Enabled Function"""
-        await self._device.api_client.property.async_update_property_settings(self._device.id,
-                                                                              {'pressure_tests_enabled': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_settings({'pressure_tests_enabled': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the Pressure Tests Enabled Function"""
-        await self._device.api_client.property.async_update_property_settings(self._device.id,
-                                                                              {'pressure_tests_enabled': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_settings({'pressure_tests_enabled': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -182,13 +180,16 @@ class PressureTestsEnabled(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )
 
 
 class CloudDisconnectionAlert(PropertyEntity, SwitchEntity):
     """Switch class for the Property CloudDisconnection Alert."""
 
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("cloud_disconnection",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property CloudDisconnection Alert switch."""
@@ -209,17 +210,11 @@ class CloudDisconnectionAlert(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'cloud_disconnection': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'cloud_disconnection': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'cloud_disconnection': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'cloud_disconnection': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -229,13 +224,16 @@ class CloudDisconnectionAlert(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )
 
 
 class LowBatteryLevelAlert(PropertyEntity, SwitchEntity):
     """Switch class for the Property low battery level Alert."""
 
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("low_battery_level",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property low_battery_level Alert switch."""
@@ -256,17 +254,11 @@ class LowBatteryLevelAlert(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'low_battery_level': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'low_battery_level': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'low_battery_level': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'low_battery_level': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -276,13 +268,16 @@ class LowBatteryLevelAlert(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )
 
 
 class LegionellaCheckAlert(PropertyEntity, SwitchEntity):
     """Switch class for the Property Legionella Check Alert."""
 
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("legionella_risk",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property legionella_check Alert switch."""
@@ -303,17 +298,11 @@ class LegionellaCheckAlert(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'legionella_risk': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'legionella_risk': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'legionella_risk': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'legionella_risk': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -323,13 +312,16 @@ class LegionellaCheckAlert(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )
 
 
 class LowWaterTemperatureAlert(PropertyEntity, SwitchEntity):
     """Switch class for the Property Low Water Temperature Alert."""
 
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("low_water_temperature",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property Low Water Temperature Alert switch."""
@@ -350,17 +342,11 @@ class LowWaterTemperatureAlert(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'low_water_temperature': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'low_water_temperature': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'low_water_temperature': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'low_water_temperature': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -370,13 +356,16 @@ class LowWaterTemperatureAlert(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )
 
 
 class DeviceHandleMovedAlert(PropertyEntity, SwitchEntity):
     """Switch class for the Device Handle Moved Alert."""
 
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("device_handle_moved",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property Device Handle Moved Alert switch."""
@@ -397,17 +386,11 @@ class DeviceHandleMovedAlert(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'device_handle_moved': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'device_handle_moved': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'device_handle_moved': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'device_handle_moved': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -417,13 +400,16 @@ class DeviceHandleMovedAlert(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )
 
 
 class HealthCheckFailedAlert(PropertyEntity, SwitchEntity):
     """Switch class for the Health Check Failed Alert."""
 
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("health_check_failed",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property Health Check Failed Alert switch."""
@@ -444,17 +430,11 @@ class HealthCheckFailedAlert(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'health_check_failed': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'health_check_failed': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'health_check_failed': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'health_check_failed': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -464,13 +444,16 @@ class HealthCheckFailedAlert(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )
 
 
 class PressureTestFailedAlert(PropertyEntity, SwitchEntity):
     """Switch class for the Pressure Test Failed Alert."""
 
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("pressure_test_failed",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property Pressure Test Failed Alert switch."""
@@ -491,17 +474,11 @@ class PressureTestFailedAlert(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'pressure_test_failed': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'pressure_test_failed': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'pressure_test_failed': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'pressure_test_failed': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -511,13 +488,16 @@ class PressureTestFailedAlert(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )
 
 
 class PressureTestSkippedAlert(PropertyEntity, SwitchEntity):
     """Switch class for the Pressure Test Skipped Alert."""
 
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("pressure_test_skipped",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property Pressure Test Skipped Alert switch."""
@@ -538,17 +518,11 @@ class PressureTestSkippedAlert(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'pressure_test_skipped': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'pressure_test_skipped': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'pressure_test_skipped': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'pressure_test_skipped': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -558,13 +532,16 @@ class PressureTestSkippedAlert(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )
 
 
 class RadioDisconnectionAlert(PropertyEntity, SwitchEntity):
     """Switch class for the Radio Disconnection Alert."""
 
     _attr_entity_category = EntityCategory.CONFIG
+    _source_fields = ("radio_disconnection",)
 
     def __init__(self, device: PropertyDataUpdateCoordinator) -> None:
         """Initialize the Property Radio Disconnection Alert switch."""
@@ -585,17 +562,11 @@ class RadioDisconnectionAlert(PropertyEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'radio_disconnection': True})
-        self._state = True
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'radio_disconnection': True})
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the Alert"""
-        await self._device.api_client.property.async_update_property_notifications(self._device.id,
-                                                                                   {'radio_disconnection': False})
-        self._state = False
-        self.async_write_ha_state()
+        await self._device.async_update_property_notifications({'radio_disconnection': False})
 
     @callback
     def async_update_state(self) -> None:
@@ -605,4 +576,6 @@ class RadioDisconnectionAlert(PropertyEntity, SwitchEntity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
-        self.async_on_remove(self._device.async_add_listener(self.async_update_state))
+        self.async_on_remove(
+            self._device.async_add_listener(self.async_update_state, self._source_fields)
+        )